@@ -0,0 +1,160 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""
+Time DriverCommands against the local Polatis simulator
+
+    python -m benchmarks.benchmark_driver_commands --sizes 16 64 640 --latency 0.005 --output bench.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import time
+
+from cloudshell.layer_one.core.helper.runtime_configuration import RuntimeConfiguration
+
+from benchmarks.polatis_simulator import PolatisSimulator
+
+SIZES = [16, 32, 64, 128, 192, 384, 640]
+PORT_MODES = ["LOGICAL", "PHYSICAL"]
+FAN_OUT = 8
+TOPOLOGY_SIZE = 200
+ADDRESS = "127.0.0.1"
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "polatis_runtime_config.yml")
+
+
+def configure(port, port_mode):
+    """ Point the driver runtime configuration to the simulator """
+
+    configuration = RuntimeConfiguration(CONFIG_PATH).configuration
+    configuration["CLI"]["TYPE"] = ["TL1"]
+    configuration["CLI"]["PORTS"]["TL1"] = port
+    configuration["CLI"]["KEEPALIVE_INTERVAL"] = 0
+    configuration["DRIVER"]["PORT_MODE"] = port_mode
+    configuration["DRIVER"]["METRICS_INTERVAL"] = 0
+    configuration["DRIVER"]["WARMUP"] = False
+
+
+def create_driver(port, port_mode, logger):
+    from polatis.cli.l1_cli_handler import L1CliHandler
+    from polatis.driver_commands import DriverCommands
+    from polatis.helper.device_profile_cache import DeviceProfileCache
+
+    configure(port, port_mode)
+    L1CliHandler.TRANSPORT_CACHE.clear()
+    driver = DriverCommands(logger, RuntimeConfiguration())
+    # every benchmark starts without device profile
+    driver._profile_cache = DeviceProfileCache(None, logger)
+    driver.login(ADDRESS, "admin", "root")
+    return driver
+
+
+def port_address(port):
+    return "{}/1/{}".format(ADDRESS, port)
+
+
+def scenarios(size, port_mode):
+    """ Benchmarked operations, each is (name, connect_all, operation)
+    :param size: ingress ports count of the simulated switch
+    :param port_mode: LOGICAL/PHYSICAL
+    """
+
+    # in physical mode ports above size are egress ports
+    peer = size + 1 if port_mode == "PHYSICAL" else 2
+    fan_out = [port_address(port) for port in range(2, min(FAN_OUT, size) + 2)]
+    clear_ports = [port_address(port) for port in range(1, size + 1)]
+    # links between neighbour ports, replacing all existing connections
+    topology = [(port_address(port), port_address(size + port + 1 if port_mode == "PHYSICAL" else port + 1))
+                for port in range(1, min(size, TOPOLOGY_SIZE * 2), 2)]
+
+    # the response is serialized as the driver server sends it
+    yield "autoload", True, lambda driver: "".join(driver.get_resource_description(ADDRESS).iter_xml())
+    yield "map_bidi", False, lambda driver: driver.map_bidi(port_address(1), port_address(peer))
+    if port_mode == "LOGICAL":
+        yield "map_uni fan-out", False, lambda driver: driver.map_uni(port_address(1), fan_out)
+    yield "map_clear", True, lambda driver: driver.map_clear(clear_ports)
+    yield "apply_connections", True, lambda driver: driver.apply_connections(topology)
+
+
+def run(sizes, port_modes, repeat, latency, inflation, logger):
+    """ Run all scenarios
+    :return: list of result dicts
+    """
+
+    results = []
+    for port_mode in port_modes:
+        for size in sizes:
+            with PolatisSimulator(size, latency=latency, inflation=inflation) as simulator:
+                driver = create_driver(simulator.port, port_mode, logger)
+                for name, connect_all, operation in scenarios(size, port_mode):
+                    timings = []
+                    commands = 0
+                    for _ in range(repeat):
+                        if connect_all:
+                            simulator.connect_all()
+                        del simulator.commands[:]
+                        start = time.time()
+                        operation(driver)
+                        timings.append(time.time() - start)
+                        commands = len(simulator.commands)
+                    timings.sort()
+                    results.append({"mode": port_mode,
+                                    "size": "{}x{}".format(size, size),
+                                    "operation": name,
+                                    "min": timings[0],
+                                    "median": timings[len(timings) // 2],
+                                    "commands": commands})
+                    print_result(results[-1])
+    return results
+
+
+def print_result(result):
+    print("{mode:<9} {size:>9} {operation:<18} min {min:8.4f}s  median {median:8.4f}s  "
+          "{commands:4d} commands".format(**result))
+
+
+def compare(results, baseline_path, threshold):
+    """ Report operations which became slower than in the baseline results
+    :return: True if there are no regressions
+    """
+
+    with open(baseline_path) as baseline_file:
+        baseline = dict(((result["mode"], result["size"], result["operation"]), result)
+                        for result in json.load(baseline_file))
+
+    passed = True
+    for result in results:
+        previous = baseline.get((result["mode"], result["size"], result["operation"]))
+        if previous and result["median"] > previous["median"] * (1 + threshold):
+            passed = False
+            print("REGRESSION {mode} {size} {operation}: {median:.4f}s".format(**result) +
+                  ", baseline {:.4f}s".format(previous["median"]))
+    return passed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Polatis driver commands benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="NxN switch sizes")
+    parser.add_argument("--modes", nargs="+", default=PORT_MODES, choices=PORT_MODES)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0, help="simulator delay before each response, seconds")
+    parser.add_argument("--inflation", type=int, default=0, help="padding bytes added to each response record")
+    parser.add_argument("--output", help="save results as json")
+    parser.add_argument("--baseline", help="json results to compare with")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown against the baseline")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+    results = run(args.sizes, args.modes, args.repeat, args.latency, args.inflation, logging.getLogger("benchmark"))
+
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(results, output_file, indent=2)
+    if args.baseline and not compare(results, args.baseline, args.threshold):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
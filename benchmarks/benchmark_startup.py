@@ -0,0 +1,151 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""
+Time driver process startup: time-to-listening of Main.run_driver('polatis') and the first Login command
+
+    python -m benchmarks.benchmark_startup --repeat 10 --output startup.json
+"""
+
+import argparse
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import yaml
+
+from benchmarks.polatis_simulator import PolatisSimulator
+
+ROOT_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONFIG_PATH = os.path.join(ROOT_PATH, "polatis_runtime_config.yml")
+ADDRESS = "127.0.0.1"
+START_TIMEOUT = 30
+
+DRIVER_SCRIPT = """
+import os, sys
+from main import Main
+Main(os.path.join(sys.argv[1], 'main.py'), int(sys.argv[2]), os.path.join(sys.argv[1], 'Logs')).run_driver('polatis')
+"""
+
+LOGIN_REQUEST = ('<Commands xmlns="http://schemas.qualisystems.com/ResourceManagement/DriverCommands.xsd">'
+                 '<Command CommandName="Login" CommandId="1"><Parameters>'
+                 '<Address>{}</Address><User>admin</User><Password>root</Password>'
+                 '</Parameters></Command></Commands>\r\n')
+
+
+def free_port():
+    server_socket = socket.socket()
+    server_socket.bind((ADDRESS, 0))
+    port = server_socket.getsockname()[1]
+    server_socket.close()
+    return port
+
+
+def create_driver_path(session_types, simulator_port):
+    """ Temporary driver folder with runtime configuration pointing to the simulator """
+
+    with open(CONFIG_PATH) as config_file:
+        configuration = yaml.safe_load(config_file)
+    configuration["CLI"]["TYPE"] = session_types
+    configuration["CLI"]["PORTS"]["TL1"] = simulator_port
+    configuration["CLI"]["KEEPALIVE_INTERVAL"] = 0
+    configuration["DRIVER"]["METRICS_INTERVAL"] = 0
+
+    driver_path = tempfile.mkdtemp(prefix="polatis_startup")
+    with open(os.path.join(driver_path, "polatis_runtime_config.yml"), "w") as config_file:
+        yaml.safe_dump(configuration, config_file, default_flow_style=False)
+    return driver_path
+
+
+def connect(port, start):
+    """ Wait until the driver accepts connections
+    :return: connected socket
+    """
+
+    while True:
+        try:
+            return socket.create_connection((ADDRESS, port))
+        except socket.error:
+            if time.time() - start > START_TIMEOUT:
+                raise
+            time.sleep(0.002)
+
+
+def login(connection):
+    connection.sendall(LOGIN_REQUEST.format(ADDRESS))
+    response = ""
+    while "</Responses>" not in response:
+        data = connection.recv(4096)
+        if not data:
+            raise Exception("Connection closed, response: {}".format(response))
+        response += data
+    if 'Success="true"' not in response:
+        raise Exception("Login failed: {}".format(response))
+
+
+def run_once(driver_path):
+    """ Start driver process, connect and log in
+    :return: (time-to-listening, login time) in seconds
+    """
+
+    port = free_port()
+    with open(os.devnull, "w") as devnull:
+        start = time.time()
+        process = subprocess.Popen([sys.executable, "-c", DRIVER_SCRIPT, driver_path, str(port)], cwd=ROOT_PATH,
+                                   stdout=devnull, stderr=devnull)
+        try:
+            connection = connect(port, start)
+            listening = time.time() - start
+            login_start = time.time()
+            login(connection)
+            connection.close()
+            return listening, time.time() - login_start
+        finally:
+            process.kill()
+            process.wait()
+
+
+def run(session_types, repeat):
+    """ Start the driver repeat times
+    :return: result dict
+    """
+
+    with PolatisSimulator(16) as simulator:
+        driver_path = create_driver_path(session_types, simulator.port)
+        try:
+            timings = [run_once(driver_path) for _ in range(repeat)]
+        finally:
+            shutil.rmtree(driver_path, ignore_errors=True)
+
+    listening = sorted(timing[0] for timing in timings)
+    first_login = sorted(timing[1] for timing in timings)
+    return {"session_types": session_types,
+            "listening_min": listening[0],
+            "listening_median": listening[len(listening) // 2],
+            "login_min": first_login[0],
+            "login_median": first_login[len(first_login) // 2]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Polatis driver startup benchmark")
+    parser.add_argument("--types", nargs="+", default=["TL1"], help="CLI.TYPE session types")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="save results as json")
+    args = parser.parse_args()
+
+    result = run(args.types, args.repeat)
+    print("{} time-to-listening min {:.3f}s median {:.3f}s, first login min {:.3f}s median {:.3f}s".format(
+        ",".join(result["session_types"]), result["listening_min"], result["listening_median"],
+        result["login_min"], result["login_median"]))
+
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(result, output_file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import argparse
+import SocketServer
+import socket
+import threading
+import time
+
+from polatis.helper.port_list import decode_port_list
+
+
+class PolatisSimulator(SocketServer.ThreadingTCPServer):
+    """ Local TCP TL1 server which emulates Polatis switch """
+
+    allow_reuse_address = True
+    daemon_threads = True
+
+    SWITCH_NAME = "SIMULATOR"
+    COMPLD = "COMPLD"
+    DENY = "DENY"
+    # commands reported to sessions which allowed autonomous messages
+    REPORTED_COMMANDS = ("ENT-PATCH", "DLT-PATCH")
+
+    def __init__(self, size1, size2=None, latency=0, inflation=0, host="127.0.0.1", port=0):
+        """
+        :param size1: ingress ports count
+        :param size2: egress ports count, same as size1 by default
+        :param latency: delay in seconds before each response
+        :param inflation: padding bytes added to each response record
+        :param host: listening address
+        :param port: listening port, any free port by default
+        """
+
+        SocketServer.ThreadingTCPServer.__init__(self, (host, port), PolatisRequestHandler)
+        self.size1 = size1
+        self.size2 = size2 or size1
+        self.latency = latency
+        self.inflation = inflation
+        self.patch = {}
+        self.commands = []
+        self.lock = threading.Lock()
+        self.subscribers = set()
+        self._message_tag = 0
+        self._thread = None
+
+        self._handlers = {"ACT-USER": self._act_user,
+                          "RTRV-HDR": self._empty,
+                          "ALW-MSG-ALL": self._empty,
+                          "RTRV-INV": self._rtrv_inv,
+                          "RTRV-NETYPE": self._rtrv_netype,
+                          "RTRV-EQPT": self._rtrv_eqpt,
+                          "RTRV-PATCH": self._rtrv_patch,
+                          "RTRV-PORT-POWER": self._rtrv_port_power,
+                          "RTRV-PORT-PMON": self._rtrv_port_pmon,
+                          "ENT-PATCH": self._ent_patch,
+                          "DLT-PATCH": self._dlt_patch,
+                          }
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    @property
+    def ports_count(self):
+        return self.size1 + self.size2
+
+    def start(self):
+        """ Serve connections in a background thread """
+
+        self._thread = threading.Thread(target=self.serve_forever, name="PolatisSimulator")
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def connect_all(self):
+        """ Connect every ingress port to the egress port with the same index """
+
+        with self.lock:
+            self.patch = dict((port, self.size1 + port) for port in range(1, min(self.size1, self.size2) + 1))
+
+    def execute(self, command):
+        """ Execute single TL1 command
+        :param command: command without terminating ';'
+        :return: TL1 response
+        :rtype: str
+        """
+
+        fields = command.strip().split(":")
+        verb = fields[0].upper()
+        aid = fields[2] if len(fields) > 2 else ""
+        ctag = fields[3] if len(fields) > 3 else "0"
+
+        with self.lock:
+            self.commands.append(verb)
+
+        handler = self._handlers.get(verb)
+        if not handler:
+            return self._response(ctag, self.DENY, ["/* Input, Command Not Valid */"])
+
+        try:
+            records = handler(aid)
+        except ValueError as e:
+            return self._response(ctag, self.DENY, ["/* {} */".format(e)])
+
+        if self.latency:
+            time.sleep(self.latency)
+        return self._response(ctag, self.COMPLD, records)
+
+    def report(self, message, records=()):
+        """ Send autonomous message to the sessions which allowed autonomous messages
+        :param message: 'REPT EVT PATCH'
+        :param records: message records
+        """
+
+        with self.lock:
+            self._message_tag += 1
+            subscribers = list(self.subscribers)
+            block = "\r\n\n   {} {}\r\nA  {} {}\r\n{};".format(
+                self.SWITCH_NAME, time.strftime("%y-%m-%d %H:%M:%S"), self._message_tag, message,
+                "".join("   {}\r\n".format(record) for record in records))
+        for subscriber in subscribers:
+            subscriber.send(block)
+
+    def _response(self, ctag, status, records):
+        padding = "   /* {} */\r\n".format("*" * self.inflation) if self.inflation else ""
+        body = "".join("   {}\r\n{}".format(record, padding) for record in records)
+        return "\r\n\n   {} {}\r\nM  {} {}\r\n{};".format(self.SWITCH_NAME, time.strftime("%y-%m-%d %H:%M:%S"),
+                                                      ctag, status, body)
+
+    def _ports(self, aid):
+        ports = decode_port_list(aid) if aid else range(1, self.ports_count + 1)
+        for port in ports:
+            if not 0 < port <= self.ports_count:
+                raise ValueError("Input, Invalid Access identifier {}".format(port))
+        return ports
+
+    def _empty(self, aid):
+        return []
+
+    def _act_user(self, aid):
+        return []
+
+    def _rtrv_inv(self, aid):
+        return ['"OCS:SN=SIM{}X{},PN=OST-{}x{}"'.format(self.size1, self.size2, self.size1, self.size2)]
+
+    def _rtrv_netype(self, aid):
+        return ['"POLATIS,OST,OPTICAL SWITCH,6.6.1"']
+
+    def _rtrv_eqpt(self, aid):
+        return ['"SYSTEM:SIZE={}x{}"'.format(self.size1, self.size2)]
+
+    def _rtrv_patch(self, aid):
+        with self.lock:
+            return ['"{},{}"'.format(ingress, egress) for ingress, egress in sorted(self.patch.items())]
+
+    def _rtrv_port_power(self, aid):
+        return ['"{}:{:.2f}"'.format(port, -1.5 - port % 10) for port in self._ports(aid)]
+
+    def _rtrv_port_pmon(self, aid):
+        return ['"{}:1550.00,0.00,0.00"'.format(port) for port in self._ports(aid)]
+
+    def _ent_patch(self, aid):
+        ingress_list, _, egress_list = aid.partition(",")
+        pairs = zip(self._ports(ingress_list), self._ports(egress_list))
+        if not pairs:
+            raise ValueError("Input, Invalid Access identifier {}".format(aid))
+        with self.lock:
+            for ingress, egress in pairs:
+                self._disconnect([ingress, egress])
+                self.patch[ingress] = egress
+        return []
+
+    def _dlt_patch(self, aid):
+        with self.lock:
+            self._disconnect(self._ports(aid))
+        return []
+
+    def _disconnect(self, ports):
+        ports = set(ports)
+        for ingress, egress in self.patch.items():
+            if ingress in ports or egress in ports:
+                del self.patch[ingress]
+
+
+class PolatisRequestHandler(SocketServer.BaseRequestHandler):
+    def setup(self):
+        # responses and autonomous messages from other sessions are not interleaved
+        self._send_lock = threading.Lock()
+
+    def send(self, data):
+        with self._send_lock:
+            try:
+                self.request.sendall(data)
+            except socket.error:
+                pass
+
+    def handle(self):
+        data = ""
+        try:
+            while True:
+                chunk = self.request.recv(4096)
+                if not chunk:
+                    break
+                data += chunk
+                while ";" in data:
+                    command, data = data.split(";", 1)
+                    if command.strip():
+                        self._execute(command)
+        finally:
+            with self.server.lock:
+                self.server.subscribers.discard(self)
+
+    def _execute(self, command):
+        response = self.server.execute(command)
+        self.send(response)
+
+        verb = command.strip().split(":")[0].upper()
+        if verb == "ALW-MSG-ALL":
+            with self.server.lock:
+                self.server.subscribers.add(self)
+        elif verb in self.server.REPORTED_COMMANDS and self.server.COMPLD in response:
+            self.server.report("REPT EVT PATCH")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Polatis TL1 simulator")
+    parser.add_argument("--size", default="16x16", help="switch size, 16x16")
+    parser.add_argument("--port", type=int, default=3082)
+    parser.add_argument("--latency", type=float, default=0, help="delay in seconds before each response")
+    parser.add_argument("--inflation", type=int, default=0, help="padding bytes added to each response record")
+    args = parser.parse_args()
+
+    size1, size2 = [int(size) for size in args.size.split("x")]
+    simulator = PolatisSimulator(size1, size2, args.latency, args.inflation, host="0.0.0.0", port=args.port)
+    print("Polatis {}x{} simulator is listening on port {}".format(size1, size2, simulator.port))
+    simulator.serve_forever()
@@ -2,14 +2,141 @@
 # -*- coding: utf-8 -*-
 import importlib
 import os
+import re
+import socket
 import sys
+import threading
+import traceback
 from datetime import datetime
+from xml.etree.ElementTree import Element
 
 from cloudshell.core.logger.qs_logger import get_qs_logger
+from cloudshell.layer_one.core import driver_listener
 from cloudshell.layer_one.core.command_executor import CommandExecutor
+from cloudshell.layer_one.core.connection_handler import ConnectionClosedException, ConnectionHandler
 from cloudshell.layer_one.core.driver_listener import DriverListener
 from cloudshell.layer_one.core.helper.runtime_configuration import RuntimeConfiguration
 from cloudshell.layer_one.core.helper.xml_logger import XMLLogger
+from cloudshell.layer_one.core.response.command_responses_builder import CommandResponsesBuilder
+from cloudshell.layer_one.core.response.response_info import ResponseInfo
+
+
+class LazyDriverCommands(object):
+    """ Driver commands created on the first driver command, driver module is not imported before it """
+
+    def __init__(self, driver_name, logger, runtime_config):
+        """
+        :param driver_name: driver package name, polatis
+        :param logger: command logger
+        :param runtime_config: runtime configuration
+        """
+
+        self._driver_name = driver_name
+        self._logger = logger
+        self._runtime_config = runtime_config
+        self._lock = threading.Lock()
+        self._instance = None
+
+    def _driver_instance(self):
+        with self._lock:
+            if self._instance is None:
+                driver_commands = importlib.import_module('{}.driver_commands'.format(self._driver_name), package=None)
+                self._instance = driver_commands.DriverCommands(self._logger, self._runtime_config)
+        return self._instance
+
+    def __getattr__(self, name):
+        return getattr(self._driver_instance(), name)
+
+
+class StreamingXMLLogger(XMLLogger):
+    """ XML logger which also writes responses in chunks """
+
+    def write(self, data):
+        self._descriptor.write(self._prepare_output(data))
+
+    def end_response(self):
+        self._descriptor.write("\r\n")
+        self._descriptor.flush()
+
+
+class StreamedResponseInfo(ResponseInfo):
+    """ Placeholder of response info which is serialized separately from the response document """
+
+    def __init__(self, index):
+        self.index = index
+
+    def build_xml_node(self):
+        return Element("StreamedResponseInfo", Index=str(self.index))
+
+
+class StreamingConnectionHandler(ConnectionHandler):
+    """ Response info providing iter_xml is sent and logged while it is serialized,
+    the whole response document is not built in memory
+    """
+
+    PLACEHOLDER = re.compile(r'<StreamedResponseInfo Index="(\d+)" />')
+    SEND_SIZE = 65536
+
+    def run(self):
+        while True:
+            try:
+                command_requests = self._read_request_commands()
+                responses = self._command_executor.execute_commands(command_requests)
+                self._send_chunks(self._iter_response(responses))
+            except ConnectionClosedException:
+                self._connection_socket.close()
+                self._logger.debug("Connection closed by remote host")
+                break
+            except socket.timeout:
+                self._connection_socket.close()
+                self._logger.debug("Connection closed by timeout")
+                break
+            except Exception as ex:
+                self._send_response(CommandResponsesBuilder.to_string(
+                    CommandResponsesBuilder.build_xml_error(0, ex.message)))
+                self._logger.critical(traceback.format_exc())
+                self._connection_socket.close()
+                break
+
+    def _iter_response(self, responses):
+        """ Responses document, streamed response infos are serialized in place of their placeholders
+        :return: iterator of document chunks
+        """
+
+        streamed = []
+        for response in responses:
+            if hasattr(response.response_info, "iter_xml"):
+                streamed.append(response.response_info)
+                response.response_info = StreamedResponseInfo(len(streamed) - 1)
+
+        document = CommandResponsesBuilder.to_string(CommandResponsesBuilder.build_xml_result(responses))
+        position = 0
+        for match in self.PLACEHOLDER.finditer(document):
+            yield document[position:match.start()]
+            for chunk in streamed[int(match.group(1))].iter_xml():
+                yield chunk.replace("\n", "\r\n")
+            position = match.end()
+        yield document[position:]
+
+    def _send_chunks(self, chunks):
+        """ Send and log chunks in blocks of SEND_SIZE """
+
+        block = []
+        block_size = 0
+        for chunk in chunks:
+            block.append(chunk)
+            block_size += len(chunk)
+            if block_size >= self.SEND_SIZE:
+                self._send_block(block)
+                block = []
+                block_size = 0
+        self._send_block(block, end=self.END_COMMAND + self.END_COMMAND)
+        self._xml_logger.end_response()
+
+    def _send_block(self, block, end=""):
+        data = "".join(block)
+        self._connection_socket.sendall(data + end)
+        self._xml_logger.write(data)
 
 
 class Main(object):
@@ -26,7 +153,7 @@ class Main(object):
 
         # Creating XMl logger instance
         xml_file_name = driver_name + '--' + datetime.now().strftime('%d-%b-%Y--%H-%M-%S') + '.xml'
-        xml_logger = XMLLogger(os.path.join(self._log_path, driver_name, xml_file_name))
+        xml_logger = StreamingXMLLogger(os.path.join(self._log_path, driver_name, xml_file_name))
 
         # Creating command logger instance
         command_logger = get_qs_logger(log_group=driver_name,
@@ -36,13 +163,15 @@ class Main(object):
 
         command_logger.info('Starting driver {0} on port {1}, PID: {2}'.format(driver_name, self._port, os.getpid()))
 
-        # Importing and creating driver commands instance
-        driver_commands = importlib.import_module('{}.driver_commands'.format(driver_name), package=None)
-        driver_instance = driver_commands.DriverCommands(command_logger, runtime_config)
+        # Driver commands module is imported on the first driver command, listening starts without it
+        driver_instance = LazyDriverCommands(driver_name, command_logger, runtime_config)
 
         # Creating command executor instance
         command_executor = CommandExecutor(driver_instance, command_logger)
 
+        # Responses are streamed by the connection handlers created by the listener
+        driver_listener.ConnectionHandler = StreamingConnectionHandler
+
         # Creating listener instance
         server = DriverListener(command_executor, xml_logger, command_logger)
 
@@ -0,0 +1,52 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import socket
+import time
+
+from cloudshell.cli.session.session_exceptions import CommandExecutionException, ExpectedSessionException
+
+
+class CircuitBreakerMixin(object):
+    """ Report transport failures of the session to the circuit breaker of its host and session type,
+    connection is refused immediately while the circuit is open
+    """
+
+    circuit_breaker = None
+
+    def _report(self, success):
+        if self.circuit_breaker:
+            self.circuit_breaker.record(success)
+
+    def connect(self, prompt, logger):
+        if self.circuit_breaker and not self.circuit_breaker.allow():
+            raise ExpectedSessionException(self.__class__.__name__, "{} is not responding over {}, retry in {:.0f}s".
+                                           format(self.host, self.session_type, self.circuit_breaker.retry_after))
+
+        try:
+            super(CircuitBreakerMixin, self).connect(prompt, logger)
+        except CommandExecutionException:
+            # switch responded but refused the login
+            self._report(True)
+            raise
+        except (socket.error, ExpectedSessionException):
+            self._report(False)
+            raise
+        self._report(True)
+
+    def reconnect(self, prompt, logger, timeout=None):
+        """ Reconnect until reconnect timeout, attempts stop as soon as the circuit opens """
+
+        if not self.circuit_breaker:
+            return super(CircuitBreakerMixin, self).reconnect(prompt, logger, timeout)
+
+        timeout = timeout or self._reconnect_timeout
+        call_time = time.time()
+        while time.time() - call_time < timeout and self.circuit_breaker.allow():
+            try:
+                self.disconnect()
+                return self.connect(prompt, logger)
+            except Exception as e:
+                logger.debug(e)
+        raise ExpectedSessionException(self.__class__.__name__,
+                                       'Reconnect unsuccessful, see logs for more details')
@@ -0,0 +1,65 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from cloudshell.cli.session.session_exceptions import CommandExecutionException
+from polatis.cli.tl1_command import TL1Command
+
+
+class CommandPipeline(object):
+    """ Execute several command templates in a single round-trip """
+
+    def __init__(self, cli_service, logger):
+        """
+        :param cli_service: default mode cli_service
+        :type cli_service: CliService
+        :param logger:
+        :type logger: Logger
+        """
+
+        self._cli_service = cli_service
+        self._logger = logger
+        self._commands = []
+        self._consumers = []
+
+    def add(self, command_template, consumer=None, **command_kwargs):
+        """ Add command to the pipeline
+        :type command_template: cloudshell.cli.command_template.command_template.CommandTemplate
+        :param consumer: object with feed(data) and close() methods taking the response while it is received,
+            output of the command contains the response header only
+        :return: index of the command output
+        :rtype: int
+        """
+
+        self._consumers.append(consumer)
+
+        if isinstance(command_template, TL1Command):
+            self._commands.append(command_template.format(**command_kwargs))
+        else:
+            self._commands.append(command_template.prepare_command(**command_kwargs))
+        return len(self._commands) - 1
+
+    def execute(self):
+        """ Execute added commands, commands are sent one by one if session does not support pipelining
+        :return: outputs in commands order, CommandExecutionException instances for failed commands
+        :rtype: list
+        """
+
+        commands, self._commands = self._commands, []
+        consumers, self._consumers = self._consumers, []
+        session = self._cli_service.session
+        if hasattr(session, "pipeline_expect"):
+            return session.pipeline_expect(commands, self._logger, consumers=consumers)
+
+        outputs = []
+        for command, consumer in zip(commands, consumers):
+            if isinstance(command, TL1Command):
+                command = command.prepare_command()
+            try:
+                outputs.append(self._cli_service.send_command(command))
+            except CommandExecutionException as e:
+                outputs.append(e)
+            else:
+                if consumer:
+                    consumer.feed(outputs[-1])
+                    consumer.close()
+        return outputs
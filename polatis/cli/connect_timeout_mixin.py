@@ -0,0 +1,16 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+
+class ConnectTimeoutMixin(object):
+    """ Limit connection establishment time independently of the session read timeout """
+
+    connect_timeout = None
+
+    def _initialize_session(self, prompt, logger):
+        read_timeout = self._timeout
+        self._timeout = self.connect_timeout or read_timeout
+        try:
+            super(ConnectTimeoutMixin, self)._initialize_session(prompt, logger)
+        finally:
+            self._timeout = read_timeout
@@ -1,86 +1,158 @@
 #!/usr/bin/python
 # -*- coding: utf-8 -*-
 
-import re
+import importlib
+import threading
+import time
+
 from cloudshell.cli.cli import CLI
-from cloudshell.cli.session.scpi_session import SCPISession
-from cloudshell.cli.session.ssh_session import SSHSession
-from cloudshell.cli.session.telnet_session import TelnetSession
-from cloudshell.cli.session.tl1_session import TL1Session
-from cloudshell.cli.session_pool_manager import SessionPoolManager
 from cloudshell.layer_one.core.helper.runtime_configuration import RuntimeConfiguration
 from cloudshell.layer_one.core.layer_one_driver_exception import LayerOneDriverException
 
-
-class TL1Session_Polatis(TL1Session):
-    def __init__(self, host, username, password, port, on_session_start=None, *args, **kwargs):
-        super(TL1Session_Polatis, self).__init__(host, username, password, port,
-                                                 on_session_start, *args, **kwargs)
-
-    def _connect_actions(self, prompt, logger):
-        output = self.hardware_expect('ACT-USER::%s:<counter>::%s;' % (self._username, self._password),
-                                      expected_string=None,
-                                      logger=logger)
-        if '( nil )' in output:
-            self.switch_name = ''
-            logger.info('Switch name was "( nil )" - using blank switch name')
-        else:
-            match = re.search(r'^(.*)\s+\d+-', output, re.MULTILINE)
-            if match:
-                self.switch_name = match.groups()[0].strip()
-                logger.info('Taking as switch name: "%s"' % self.switch_name)
-            else:
-                logger.warn('Switch name regex not found: %s - using blank switch name' % output)
-                self.switch_name = ''
-        if self.on_session_start and callable(self.on_session_start):
-            self.on_session_start(self, logger)
-        self._active = True
-
-    def hardware_expect(self, command, expected_string, logger, action_map=None, error_map=None, timeout=None,
-                        retries=None, check_action_loop_detector=True, empty_loop_timeout=None,
-                        remove_command_from_output=True, **optional_args):
-        self._tl1_counter += 1
-        command = command.replace('<counter>', str(self._tl1_counter))
-        command = command.replace('<name>', self.switch_name)
-        prompt = r'M\s+%d\s+([A-Z ]+)[^;]*;' % self._tl1_counter
-
-        rv = super(TL1Session, self).hardware_expect(command, prompt, logger, action_map, error_map, timeout,
-                                                     retries, check_action_loop_detector, empty_loop_timeout,
-                                                     remove_command_from_output, **optional_args)
-
-        m = re.search(prompt, rv)
-        status = m.groups()[0]
-        if status != 'COMPLD':
-            raise Exception('Error: Status "%s": %s' % (status, rv))
-        return rv
+from polatis.cli.polatis_session_pool_manager import PolatisSessionPoolManager
+from polatis.helper.adaptive_timeout import AdaptiveTimeout
+from polatis.helper.circuit_breaker import CircuitBreaker
 
 
 class L1CliHandler(object):
+    # Session type which connected successfully, per host
+    TRANSPORT_CACHE = {}
+    # Session class module and name per session type, imported only when the session type is used
+    SESSION_CLASSES = {"SSH": ("polatis.cli.ssh_session_polatis", "SSHSession_Polatis"),
+                       "TELNET": ("polatis.cli.telnet_session_polatis", "TelnetSession_Polatis"),
+                       "TL1": ("polatis.cli.tl1_session_polatis", "TL1Session_Polatis"),
+                       "SCPI": ("cloudshell.cli.session.scpi_session", "SCPISession"),
+                       }
+    # Circuit breaker per host and session type
+    CIRCUIT_BREAKERS = {}
+    # Adaptive TL1 command timeouts per host
+    COMMAND_TIMEOUTS = {}
+
     def __init__(self, logger):
         self._logger = logger
-        self._cli = CLI(session_pool=SessionPoolManager(max_pool_size=1))
-        self._defined_session_types = {"SSH": SSHSession,
-                                       "TELNET": TelnetSession,
-                                       "TL1": TL1Session_Polatis,
-                                       "SCPI": SCPISession,
-                                       }
-
-        self._session_types = RuntimeConfiguration().read_key("CLI.TYPE") or self._defined_session_types.keys()
+        self._keepalive_interval = RuntimeConfiguration().read_key("CLI.KEEPALIVE_INTERVAL",
+                                                                   PolatisSessionPoolManager.KEEPALIVE_INTERVAL)
+        self.session_pool_size = RuntimeConfiguration().read_key("CLI.SESSION_POOL_SIZE", 1)
+        self._session_pool = PolatisSessionPoolManager(max_pool_size=self.session_pool_size,
+                                                       keepalive_interval=self._keepalive_interval)
+        self._cli = CLI(session_pool=self._session_pool)
+        self._keepalive_thread = None
+
+        self._session_types = RuntimeConfiguration().read_key("CLI.TYPE") or self.SESSION_CLASSES.keys()
         self._ports = RuntimeConfiguration().read_key("CLI.PORTS")
+        self._connect_timeouts = RuntimeConfiguration().read_key("CLI.CONNECT_TIMEOUT", {})
+        self._payload_sampling = RuntimeConfiguration().read_key("LOGGING.PAYLOAD_SAMPLING", 0)
+        self._min_timeout = RuntimeConfiguration().read_key("CLI.MIN_TIMEOUT", AdaptiveTimeout.MIN_TIMEOUT)
+        self._breaker_failures = RuntimeConfiguration().read_key("CLI.CIRCUIT_BREAKER_FAILURES",
+                                                                 CircuitBreaker.FAILURES)
+        self._breaker_reset = RuntimeConfiguration().read_key("CLI.CIRCUIT_BREAKER_RESET", CircuitBreaker.RESET_TIMEOUT)
 
         self._host = None
         self._username = None
         self._password = None
 
+    @property
+    def session_types(self):
+        """ Configured session types """
+
+        return list(self._session_types)
+
+    @property
+    def sessions_count(self):
+        """ Number of open sessions of the pool """
+
+        return self._session_pool.sessions_count()
+
+    @property
+    def transport(self):
+        """ Session type which connected successfully to the current host """
+
+        return self.TRANSPORT_CACHE.get(self._host)
+
+    @transport.setter
+    def transport(self, session_type):
+        if session_type in self._session_types:
+            self.TRANSPORT_CACHE[self._host] = session_type
+
+    def _ordered_session_types(self):
+        """ Configured session types, the one which worked last time for the host goes first """
+
+        session_types = list(self._session_types)
+        cached_type = self.TRANSPORT_CACHE.get(self._host)
+        if cached_type in session_types:
+            session_types.remove(cached_type)
+            session_types.insert(0, cached_type)
+        return session_types
+
+    def _on_session_start(self, session, logger):
+        """ Remember session type which connected successfully """
+
+        if self.TRANSPORT_CACHE.get(session.host) != session.session_type:
+            logger.debug("Using {} session type for {}".format(session.session_type, session.host))
+            self.TRANSPORT_CACHE[session.host] = session.session_type
+
+    def _session_class(self, session_type):
+        """ Session class of session type, its module is imported on first use """
+
+        if session_type not in self.SESSION_CLASSES:
+            raise LayerOneDriverException(self.__class__.__name__,
+                                          "Session type {} is not defined".format(session_type))
+        module_name, class_name = self.SESSION_CLASSES[session_type]
+        return getattr(importlib.import_module(module_name), class_name)
+
+    def _circuit_breaker(self, session_type):
+        """ Circuit breaker of the current host and session type, None if circuit breaker is disabled
+        :rtype: CircuitBreaker
+        """
+
+        if not self._breaker_failures:
+            return None
+        key = (self._host, session_type)
+        if key not in self.CIRCUIT_BREAKERS:
+            self.CIRCUIT_BREAKERS[key] = CircuitBreaker(self._breaker_failures, self._breaker_reset)
+        return self.CIRCUIT_BREAKERS[key]
+
+    def _command_timeouts(self):
+        """ Adaptive command timeouts of the current host
+        :rtype: AdaptiveTimeout
+        """
+
+        if self._host not in self.COMMAND_TIMEOUTS:
+            self.COMMAND_TIMEOUTS[self._host] = AdaptiveTimeout(self._min_timeout)
+        return self.COMMAND_TIMEOUTS[self._host]
+
+    def create_session(self, session_type):
+        """ Not connected session of the current host, it is not added to the session pool
+        :param session_type: TL1/SSH/TELNET/SCPI
+        """
+
+        session_class = self._session_class(session_type)
+        port = self._ports.get(session_type)
+        session = session_class(self._host, self._username, self._password, port)
+        session.on_session_start = self._on_session_start
+        session.connect_timeout = self._connect_timeouts.get(session_type)
+        session.payload_sampling = self._payload_sampling
+        session.circuit_breaker = self._circuit_breaker(session_type)
+        session.command_timeouts = self._command_timeouts()
+        return session
+
     def _new_sessions(self):
+        """ Sessions of configured types, types with open circuit are skipped
+        :raises LayerOneDriverException: if circuits of all session types are open
+        """
+
         sessions = []
-        for session_type in self._session_types:
-            session_class = self._defined_session_types.get(session_type)
-            if not session_class:
-                raise LayerOneDriverException(self.__class__.__name__,
-                                              "Session type {} is not defined".format(session_type))
-            port = self._ports.get(session_type)
-            sessions.append(session_class(self._host, self._username, self._password, port))
+        retry_after = []
+        for session_type in self._ordered_session_types():
+            circuit_breaker = self._circuit_breaker(session_type)
+            if circuit_breaker and not circuit_breaker.allow():
+                retry_after.append(circuit_breaker.retry_after)
+                continue
+            sessions.append(self.create_session(session_type))
+
+        if not sessions:
+            message = "Switch {} is not responding, retry in {:.0f}s".format(self._host, min(retry_after))
+            raise LayerOneDriverException(self.__class__.__name__, message)
         return sessions
 
     def define_session_attributes(self, address, username, password):
@@ -99,6 +171,25 @@ class L1CliHandler(object):
         self._host = address
         self._username = username
         self._password = password
+        self._start_keepalive()
+
+    def _start_keepalive(self):
+        """ Start background thread which keeps idle pooled sessions authenticated """
+
+        if not self._keepalive_interval or self._keepalive_thread:
+            return
+
+        self._keepalive_thread = threading.Thread(target=self._keepalive_loop, name="PolatisKeepalive")
+        self._keepalive_thread.daemon = True
+        self._keepalive_thread.start()
+
+    def _keepalive_loop(self):
+        while True:
+            time.sleep(self._keepalive_interval)
+            try:
+                self._session_pool.keepalive(self._logger)
+            except Exception:
+                self._logger.exception("Keepalive error")
 
     def get_cli_service(self, command_mode):
         """
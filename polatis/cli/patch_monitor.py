@@ -0,0 +1,134 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import threading
+import time
+
+import polatis.command_templates.autoload as autoload_template
+import polatis.command_templates.system as system_template
+from polatis.command_actions.autoload_actions import AutoloadActions
+from polatis.helper.command_metrics import METRICS
+
+
+class PatchMonitor(object):
+    """ Mirror of the switch patch table kept by a dedicated TL1 session listening for REPT messages,
+    patch table is re-read on the monitor session after patch change events, when the session is idle
+    and after the session was lost, monitor stops if the switch does not allow autonomous messages
+    """
+
+    RESYNC_INTERVAL = 30
+    RECONNECT_INTERVAL = 5
+    # quiet time after patch change event before the patch table is re-read, events are coalesced
+    SETTLE_TIME = 0.05
+
+    def __init__(self, session_factory, logger, resync_interval=RESYNC_INTERVAL):
+        """
+        :param session_factory: callable creating not connected TL1 session of the switch
+        :param logger:
+        :param resync_interval: seconds, idle monitor re-reads the patch table after it
+        """
+
+        self._session_factory = session_factory
+        self._logger = logger
+        self._resync_interval = resync_interval
+        self._lock = threading.Lock()
+        self._connections = None
+        self._changed = False
+        self._running = False
+        self._thread = None
+        self._session = None
+
+    @property
+    def connections(self):
+        """ Mirrored patch table, None if the mirror is not synchronized
+        :return: connections for both directions, {src: dst, dst: src}
+        :rtype: dict
+        """
+
+        with self._lock:
+            return dict(self._connections) if self._connections is not None else None
+
+    @property
+    def running(self):
+        return self._running
+
+    def invalidate(self):
+        """ Patch table was changed by the driver, the mirror is not used until it is re-read """
+
+        with self._lock:
+            self._connections = None
+            self._changed = True
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="PolatisPatchMonitor")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        session = self._session
+        if session:
+            session.disconnect()
+
+    def _on_message(self, header, block):
+        """ Any report except alarms may follow a patch change, REPT EVT and REPT DBCHG formats
+        differ between firmware versions and the changed verb is not always in the header
+        """
+
+        if not header.startswith("REPT ALM"):
+            with self._lock:
+                self._changed = True
+
+    def _run(self):
+        with METRICS.command_context("patch_monitor"):
+            while self._running:
+                try:
+                    self._monitor()
+                except Exception as e:
+                    if self._running:
+                        self._logger.warn("Patch monitor session lost, full resync after reconnect: {}".format(e))
+                finally:
+                    self.invalidate()
+                    if self._session:
+                        self._session.disconnect()
+                        self._session = None
+                if self._running:
+                    time.sleep(self.RECONNECT_INTERVAL)
+
+    def _monitor(self):
+        self._session = session = self._session_factory()
+        session.on_autonomous_message = self._on_message
+        session.connect(None, self._logger)
+        try:
+            session.tl1_expect(system_template.ALLOW_MESSAGES, self._logger)
+        except Exception as e:
+            # patch changes would not be noticed until the next resync, patch table is read from the switch instead
+            self._logger.info("Autonomous messages are not allowed, patch monitor is stopped: {}".format(e))
+            self._running = False
+            return
+
+        self._resync(session)
+        while self._running:
+            if session.wait_messages(self._resync_interval, self._logger):
+                # several events are usually reported for a single change
+                while session.wait_messages(self.SETTLE_TIME, self._logger):
+                    pass
+                if not self._changed:
+                    continue
+            self._resync(session)
+
+    def _resync(self, session):
+        """ Re-read the whole patch table, it is read again if patch change was reported meanwhile """
+
+        while True:
+            with self._lock:
+                self._changed = False
+            output = session.tl1_expect(autoload_template.PATCH, self._logger)
+            connections = AutoloadActions(None, self._logger).parse_connections(output)
+            with self._lock:
+                if not self._changed:
+                    self._connections = connections
+                    return
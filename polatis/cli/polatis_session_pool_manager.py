@@ -0,0 +1,92 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from cloudshell.cli.session_manager_impl import SessionManagerImpl
+from cloudshell.cli.session_pool_manager import SessionPoolManager
+
+from polatis.helper.command_metrics import METRICS
+
+
+class PolatisSessionPoolManager(SessionPoolManager):
+    """ Session pool which keeps authenticated sessions alive between driver commands """
+
+    KEEPALIVE_INTERVAL = 60
+
+    def __init__(self, max_pool_size=SessionPoolManager.MAX_POOL_SIZE, pool_timeout=SessionPoolManager.POOL_TIMEOUT,
+                 keepalive_interval=KEEPALIVE_INTERVAL):
+        """
+        :param max_pool_size:
+        :type max_pool_size: int
+        :param pool_timeout:
+        :type pool_timeout: int
+        :param keepalive_interval: idle time in seconds after which pooled session is verified
+        :type keepalive_interval: int
+        """
+
+        super(PolatisSessionPoolManager, self).__init__(session_manager=SessionManagerImpl(),
+                                                        max_pool_size=max_pool_size,
+                                                        pool_timeout=pool_timeout)
+        self._keepalive_interval = keepalive_interval
+
+    def _is_alive(self, session, logger):
+        """ Check pooled session, sessions without keepalive support considered alive
+        :rtype: bool
+        """
+
+        if hasattr(session, "check_alive"):
+            return session.check_alive(self._keepalive_interval, logger)
+        return True
+
+    def _get_from_pool(self, new_sessions, prompt, logger):
+        """ Get session from the pool, reconnect it if the connection was lost
+        :param new_sessions
+        :param prompt:
+        :param logger:
+        :return:
+        """
+
+        session = super(PolatisSessionPoolManager, self)._get_from_pool(new_sessions, prompt, logger)
+        if not session.new_session and not self._is_alive(session, logger):
+            logger.debug("Pooled session is not alive, reconnecting")
+            METRICS.record_retry("ACT-USER")
+            try:
+                session.reconnect(prompt, logger)
+            except Exception:
+                self.remove_session(session, logger)
+                raise
+        return session
+
+    def sessions_count(self):
+        """ Number of open sessions, sessions in use included """
+
+        return self._session_manager.existing_sessions_count()
+
+    def remove_session(self, session, logger):
+        """ Remove session from the pool and close its connection
+        :param session:
+        :param logger:
+        """
+
+        super(PolatisSessionPoolManager, self).remove_session(session, logger)
+        try:
+            session.disconnect()
+        except Exception as e:
+            logger.debug("Failed to disconnect session: {}".format(e))
+
+    def keepalive(self, logger):
+        """ Verify idle sessions, dead ones are removed and will be recreated on demand,
+        sessions are verified outside the pool lock and returned one by one
+        :param logger:
+        """
+
+        with self._session_condition:
+            sessions = []
+            while not self._pool.empty():
+                sessions.append(self._pool.get(False))
+
+        for session in sessions:
+            if self._is_alive(session, logger):
+                self.return_session(session, logger)
+            else:
+                logger.debug("Idle session is not alive, removing it from the pool")
+                self.remove_session(session, logger)
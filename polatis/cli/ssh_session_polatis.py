@@ -0,0 +1,11 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from cloudshell.cli.session.ssh_session import SSHSession
+
+from polatis.cli.circuit_breaker_mixin import CircuitBreakerMixin
+from polatis.cli.connect_timeout_mixin import ConnectTimeoutMixin
+
+
+class SSHSession_Polatis(CircuitBreakerMixin, ConnectTimeoutMixin, SSHSession):
+    pass
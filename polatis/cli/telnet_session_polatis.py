@@ -0,0 +1,11 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from cloudshell.cli.session.telnet_session import TelnetSession
+
+from polatis.cli.circuit_breaker_mixin import CircuitBreakerMixin
+from polatis.cli.connect_timeout_mixin import ConnectTimeoutMixin
+
+
+class TelnetSession_Polatis(CircuitBreakerMixin, ConnectTimeoutMixin, TelnetSession):
+    pass
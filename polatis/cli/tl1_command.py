@@ -0,0 +1,71 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from cloudshell.cli.command_template.command_template import CommandTemplate
+from cloudshell.cli.command_template.command_template_executor import CommandTemplateExecutor
+
+
+class TL1Command(CommandTemplate, object):
+    """ Pre-tokenized TL1 command 'VERB:"<name>":<aid>:<ctag>:<tail>;',
+    only ctag and switch name are substituted when the command is sent
+    """
+
+    def __init__(self, verb, aid="", tail="", named=True):
+        """
+        :param verb: TL1 verb, ENT-PATCH
+        :param aid: access identifier, may contain format fields, '{dst_ports},{src_ports}'
+        :param tail: command fields after ctag
+        :param named: command addresses the switch by its name
+        """
+
+        CommandTemplate.__init__(self, "")
+        self.verb = verb
+        self.aid = aid
+        self.tail = tail
+        self.named = named
+        if named:
+            self._head = '{}:"'.format(verb)
+            self._middle = '":{}:'.format(aid)
+        else:
+            self._head = '{}::{}:'.format(verb, aid)
+            self._middle = None
+        self._end = ":{};".format(tail)
+
+    def format(self, **command_kwargs):
+        """ Command with access identifier filled
+        :rtype: TL1Command
+        """
+
+        if not command_kwargs:
+            return self
+        return TL1Command(self.verb, self.aid.format(**command_kwargs), self.tail, self.named)
+
+    def render(self, name, ctag):
+        """ Command line
+        :param name: switch name
+        :param ctag: correlation tag
+        :rtype: str
+        """
+
+        if self._middle is None:
+            return "".join((self._head, str(ctag), self._end))
+        return "".join((self._head, name, self._middle, str(ctag), self._end))
+
+    def prepare_command(self, **command_kwargs):
+        """ Command with <name> and <counter> placeholders for generic sessions """
+
+        return self.format(**command_kwargs).render("<name>", "<counter>")
+
+    def execute(self, cli_service, logger, **command_kwargs):
+        """ Execute command, TL1 session sends it directly bypassing generic template executor
+        :param cli_service: default mode cli_service
+        :param logger:
+        :return: command output
+        :rtype: str
+        :raises CommandExecutionException: if command was not completed
+        """
+
+        session = cli_service.session
+        if hasattr(session, "tl1_expect"):
+            return session.tl1_expect(self.format(**command_kwargs), logger)
+        return CommandTemplateExecutor(cli_service, self).execute_command(**command_kwargs)
@@ -0,0 +1,435 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import random
+import re
+import select
+import socket
+import time
+
+from cloudshell.cli.helper.normalize_buffer import normalize_buffer
+from cloudshell.cli.session.session_exceptions import CommandExecutionException, ExpectedSessionException, \
+    SessionReadEmptyData, SessionReadTimeout
+from cloudshell.cli.session.tl1_session import TL1Session
+
+import polatis.command_templates.system as system_template
+from polatis.cli.circuit_breaker_mixin import CircuitBreakerMixin
+from polatis.cli.tl1_command import TL1Command
+from polatis.helper.command_metrics import METRICS, tl1_verb
+from polatis.helper.port_list import count_port_list
+from polatis.helper.trace_buffer import TRACE, tl1_ports
+
+
+class TL1Session_Polatis(CircuitBreakerMixin, TL1Session):
+    BUFFER_SIZE = 16384
+    # response header line, 'M  5 COMPLD'
+    RESPONSE_HEADER = re.compile(r'^M\s+(\d+)\s+([A-Z ]+)', re.MULTILINE)
+    # autonomous message header line, 'A  12 REPT EVT PATCH', alarm code is '*C', '**', '*' or 'A'
+    AUTONOMOUS_HEADER = re.compile(r'^(?:\*C|\*\*|\*|A)\s+\d+\s+(REPT\b.*)$', re.MULTILINE)
+    # incomplete block without response header within the limit is not streamed
+    STREAM_HEADER_LIMIT = 512
+
+    connect_timeout = None
+    # share of TL1 responses logged in full
+    payload_sampling = 0
+    # polatis.helper.adaptive_timeout.AdaptiveTimeout of the host, session timeout is used if not defined
+    command_timeouts = None
+    # callable taking autonomous message header and block, messages are dropped if not defined
+    on_autonomous_message = None
+
+    def __init__(self, host, username, password, port, on_session_start=None, *args, **kwargs):
+        super(TL1Session_Polatis, self).__init__(host, username, password, port,
+                                                 on_session_start, *args, **kwargs)
+        self._last_activity = time.time()
+        self._timed_out = False
+        self._probing = False
+        self._late_blocks = []
+        self._pending = []
+        self._streams = {}
+        self._pending_stream = None
+
+    def _initialize_session(self, prompt, logger):
+        self._timed_out = False
+        self._pending = []
+        self._pending_stream = None
+        self._handler = socket.create_connection((self.host, self.port), self.connect_timeout or self._timeout)
+        self._handler.settimeout(self._timeout)
+
+    def send_line(self, command, logger):
+        """ Send command, session which did not respond in time is not used any more until reconnected """
+
+        if self._timed_out:
+            raise ExpectedSessionException(self.__class__.__name__, 'Session did not respond in time')
+        super(TL1Session_Polatis, self).send_line(command, logger)
+
+    def _socket_closed(self):
+        """ Check if the connection was closed by the remote side """
+
+        if not self._handler:
+            return True
+        try:
+            readable, _, _ = select.select([self._handler], [], [], 0)
+            if readable:
+                return not self._handler.recv(1, socket.MSG_PEEK)
+        except (socket.error, select.error):
+            return True
+        return False
+
+    def keepalive(self, logger):
+        """ Send keepalive command """
+
+        self.tl1_expect(system_template.DEVICE_HDR, logger)
+
+    def check_alive(self, keepalive_interval, logger):
+        """ Check session connection, idle session is verified with keepalive command
+        :param keepalive_interval: idle time in seconds after which keepalive command is sent
+        :param logger:
+        :rtype: bool
+        """
+
+        if not self.active() or self._socket_closed():
+            return False
+
+        if not keepalive_interval or time.time() - self._last_activity < keepalive_interval:
+            return True
+
+        try:
+            self.keepalive(logger)
+        except Exception as e:
+            logger.debug("Keepalive failed: {}".format(e))
+            return False
+        return True
+
+    def _connect_actions(self, prompt, logger):
+        output = self.hardware_expect('ACT-USER::%s:<counter>::%s;' % (self._username, self._password),
+                                      expected_string=None,
+                                      logger=logger)
+        if '( nil )' in output:
+            self.switch_name = ''
+            logger.info('Switch name was "( nil )" - using blank switch name')
+        else:
+            match = re.search(r'^(.*)\s+\d+-', output, re.MULTILINE)
+            if match:
+                self.switch_name = match.groups()[0].strip()
+                logger.info('Taking as switch name: "%s"' % self.switch_name)
+            else:
+                logger.warn('Switch name regex not found: %s - using blank switch name' % output)
+                self.switch_name = ''
+        if self.on_session_start and callable(self.on_session_start):
+            self.on_session_start(self, logger)
+        self._active = True
+
+    def _record(self, command, start_time, status, bytes_received=0):
+        """ Add completed command to metrics, trace and latency estimate """
+
+        duration = time.time() - start_time
+        verb = tl1_verb(command)
+        METRICS.record(verb, duration, status, len(command), bytes_received)
+        TRACE.event(verb, tl1_ports(command), duration, status)
+        if status == 'ERROR':
+            if self.command_timeouts:
+                self.command_timeouts.backoff(verb)
+        else:
+            self._report(True)
+            if self.command_timeouts:
+                self.command_timeouts.update(verb, duration, self._ports_count(command))
+
+    @staticmethod
+    def _ports_count(command):
+        """ Ports count of the first port list of the command, pairs count of ENT-PATCH """
+
+        return count_port_list(tl1_ports(command).split(",", 1)[0])
+
+    def _command_timeout(self, commands, timeout):
+        """ Explicit timeout or adaptive timeout of the slowest command
+        :param commands: prepared commands
+        """
+
+        if timeout or not self.command_timeouts:
+            return timeout
+        return max(self.command_timeouts.timeout(tl1_verb(command), self._timeout, self._ports_count(command))
+                   for command in commands)
+
+    def _probe(self, logger):
+        """ Check if the switch still responds after a command timed out, RTRV-HDR is sent on the same session,
+        responses to the commands in flight received before the probe response are kept for them
+        :return: response blocks received by the probe, None if the switch did not respond
+        :rtype: list
+        """
+
+        self._probing = True
+        try:
+            self.tl1_expect(system_template.DEVICE_HDR, logger)
+        except CommandExecutionException:
+            # switch responded, even if it refused the command
+            pass
+        except Exception as e:
+            logger.debug("Switch did not respond to probe: {}".format(e))
+            return None
+        finally:
+            self._probing = False
+            late_blocks, self._late_blocks = self._late_blocks, []
+        return late_blocks
+
+    def _sample_payload(self):
+        return self.payload_sampling and random.random() < self.payload_sampling
+
+    def _log_payload(self, command, response, logger):
+        """ Log full response of sampled commands, command itself is omitted as it may contain password """
+
+        if self._sample_payload():
+            logger.info('%s %s response:\n%s', tl1_verb(command), tl1_ports(command), response)
+
+    def _prepare_command(self, command):
+        self._tl1_counter += 1
+        if isinstance(command, TL1Command):
+            return command.render(self.switch_name, self._tl1_counter)
+        command = command.replace('<counter>', str(self._tl1_counter))
+        return command.replace('<name>', self.switch_name)
+
+    def tl1_expect(self, command, logger, timeout=None):
+        """ Send pre-tokenized command and wait for the response block with its ctag
+        :type command: polatis.cli.tl1_command.TL1Command
+        :param logger:
+        :param timeout: read timeout, adaptive timeout of the command verb by default
+        :return: command output
+        :raises CommandExecutionException: if command was not completed
+        """
+
+        output = self.pipeline_expect([command], logger, timeout)[0]
+        if isinstance(output, Exception):
+            raise output
+        return output
+
+    def _read_blocks(self, timeout, logger):
+        """ Read session once and split received data into blocks terminated by ';',
+        only newly received chunk is scanned for the terminator, incomplete block is kept for the next read
+        :param timeout: read timeout, session timeout if not defined
+        :param logger:
+        :return: chunk and list of completed blocks
+        :rtype: tuple
+        :raises SessionReadTimeout: if nothing was received within timeout
+        """
+
+        try:
+            chunk = normalize_buffer(self._receive(timeout, logger))
+        except SessionReadEmptyData:
+            self._report(False)
+            raise ExpectedSessionException(self.__class__.__name__, 'Socket closed by remote side')
+
+        blocks = []
+        parts = self._pending
+        start = 0
+        end = chunk.find(';')
+        while end != -1:
+            parts.append(chunk[start:end + 1])
+            blocks.append(''.join(parts))
+            parts = []
+            self._pending_stream = None
+            start = end + 1
+            end = chunk.find(';', start)
+        if start < len(chunk):
+            parts.append(chunk[start:])
+        if parts and self._streams:
+            parts = self._stream_pending(parts)
+        self._pending = parts
+
+        if self.on_autonomous_message:
+            for block in blocks:
+                match = self.AUTONOMOUS_HEADER.search(block)
+                if match:
+                    self.on_autonomous_message(match.group(1).strip(), block)
+        return chunk, blocks
+
+    def _stream_pending(self, parts):
+        """ Pass received part of a streamed response block to its consumer, only the block header is kept
+        :param parts: parts of the incomplete block
+        :return: parts to keep
+        :rtype: list
+        """
+
+        if self._pending_stream is None:
+            data = ''.join(parts)
+            response = self._split_response(data)
+            if response:
+                ctag, header, body = response
+                self._pending_stream = self._streams.get(ctag, False)
+                parts = [header, body]
+            elif len(data) > self.STREAM_HEADER_LIMIT:
+                self._pending_stream = False
+            else:
+                return [data]
+
+        if self._pending_stream and len(parts) > 1:
+            self._pending_stream.feed(''.join(parts[1:]))
+            return parts[:1]
+        return parts
+
+    def _receive_blocks(self, timeout, logger):
+        """ Read session until the caller stops, if the read times out and the switch still responds to the probe,
+        blocks received by the probe are passed and reading continues up to the session timeout
+        :param timeout: read timeout, session timeout if not defined
+        :param logger:
+        :return: iterator of (chunk, list of completed blocks)
+        """
+
+        expired = False
+        while not expired:
+            try:
+                chunk, blocks = self._read_blocks(timeout, logger)
+            except SessionReadTimeout:
+                if self._probing:
+                    break
+                blocks = self._probe(logger)
+                if blocks is None:
+                    self._report(False)
+                    break
+                # slow command of a responding switch is not a transport failure
+                expired = not timeout or timeout >= self._timeout
+                chunk, timeout = '', None
+            yield chunk, blocks
+
+        self._timed_out = True
+        self.set_active(False)
+        raise ExpectedSessionException(self.__class__.__name__, 'Socket closed by timeout')
+
+    def wait_messages(self, timeout, logger):
+        """ Wait for autonomous messages, they are passed to on_autonomous_message
+        :param timeout: seconds
+        :param logger:
+        :return: False if nothing was received within timeout
+        :rtype: bool
+        """
+
+        readable, _, _ = select.select([self._handler], [], [], timeout)
+        if not readable:
+            return False
+        next(self._receive_blocks(timeout, logger))
+        return True
+
+    def _response_header(self, block):
+        """ Ctag and status of response block, None for command echo and autonomous messages
+        :rtype: tuple
+        """
+
+        match = self.RESPONSE_HEADER.search(block)
+        if match:
+            return match.group(1), match.group(2).strip()
+
+    def _split_response(self, data):
+        """ Split response block at the end of its header line
+        :return: ctag, block up to the end of the header line and the rest of the block, None if header is incomplete
+        :rtype: tuple
+        """
+
+        match = self.RESPONSE_HEADER.search(data)
+        if match:
+            end = data.find('\n', match.end()) + 1
+            if end:
+                return match.group(1), data[:end], data[end:]
+
+    def pipeline_expect(self, commands, logger, timeout=None, consumers=None):
+        """ Send all commands at once and match responses to the commands by ctag
+        :param commands: list of commands, command strings or TL1Command instances
+        :param logger:
+        :param timeout: read timeout, adaptive timeout of the command verb by default
+        :param consumers: list of response consumers in commands order, None for not streamed commands,
+            response body is passed to consumer feed() as it arrives and close() is called once it is completed
+        :return: outputs in commands order, CommandExecutionException instances for not completed commands,
+            outputs of streamed commands contain the response header only
+        :rtype: list
+        """
+
+        ctags = []
+        sent = {}
+        start_time = time.time()
+        for index, command in enumerate(commands):
+            command = self._prepare_command(command)
+            ctags.append(str(self._tl1_counter))
+            sent[ctags[-1]] = command
+            if consumers and consumers[index]:
+                self._streams[ctags[-1]] = consumers[index]
+            logger.debug('Command: %s', tl1_verb(command))
+            self.send_line(command, logger)
+
+        timeout = self._command_timeout(sent.values(), timeout)
+        responses = {}
+        try:
+            # blocks of stale responses, command echo and autonomous messages are skipped by ctag
+            for _, blocks in self._receive_blocks(timeout, logger):
+                for block in blocks:
+                    header = self._response_header(block)
+                    if not header or header[0] not in sent or header[0] in responses:
+                        if header and self._probing:
+                            # response to the command which outlasted its timeout, see _probe
+                            self._late_blocks.append(block)
+                        continue
+                    ctag, status = header
+                    self._record(sent[ctag], start_time, status, len(block))
+                    consumer = self._streams.pop(ctag, None)
+                    if consumer:
+                        response = self._split_response(block)
+                        if response:
+                            _, block, body = response
+                            consumer.feed(body)
+                        consumer.close()
+                    self._log_payload(sent[ctag], block, logger)
+                    if status != 'COMPLD':
+                        block = CommandExecutionException('Error: Status "%s": %s' % (status, block))
+                    responses[ctag] = block
+                if len(responses) == len(ctags):
+                    break
+        finally:
+            # streams of the command which outlasted its timeout are kept while the probe is running
+            for ctag in ctags:
+                self._streams.pop(ctag, None)
+            if not self._streams:
+                self._pending_stream = None
+            for ctag in ctags:
+                if ctag not in responses:
+                    self._record(sent[ctag], start_time, 'ERROR')
+
+        self._last_activity = time.time()
+        return [responses[ctag] for ctag in ctags]
+
+    def hardware_expect(self, command, expected_string, logger, action_map=None, error_map=None, timeout=None,
+                        retries=None, check_action_loop_detector=True, empty_loop_timeout=None,
+                        remove_command_from_output=True, **optional_args):
+        """ Send command and read its response block, expected_string and action_map are not used,
+        TL1 response is completed by ';' of the block with the command ctag
+        """
+
+        command = self._prepare_command(command)
+        ctag = str(self._tl1_counter)
+        timeout = self._command_timeout([command], timeout)
+
+        logger.debug('Command: %s', tl1_verb(command))
+        start_time = time.time()
+        self.send_line(command, logger)
+
+        status = 'ERROR'
+        rv = ''
+        try:
+            for _, blocks in self._receive_blocks(timeout, logger):
+                for block in blocks:
+                    header = self._response_header(block)
+                    if header and header[0] == ctag:
+                        status = header[1]
+                        rv = block
+                        break
+                if rv:
+                    break
+        finally:
+            self._last_activity = time.time()
+            self._record(command, start_time, status, len(rv))
+        self._log_payload(command, rv, logger)
+
+        for error_pattern, error in (error_map or {}).iteritems():
+            if re.search(error_pattern, rv, re.DOTALL):
+                if isinstance(error, CommandExecutionException):
+                    raise error
+                raise CommandExecutionException('Session returned \'{}\''.format(error))
+
+        if status != 'COMPLD':
+            raise CommandExecutionException('Error: Status "%s": %s' % (status, rv))
+        return rv
@@ -3,7 +3,12 @@
 import re
 
 import polatis.command_templates.autoload as command_template
-from cloudshell.cli.command_template.command_template_executor import CommandTemplateExecutor
+import polatis.command_templates.system as system_template
+from polatis.cli.command_pipeline import CommandPipeline
+from polatis.command_actions.system_actions import SystemActions
+from polatis.helper.port_list import encode_port_range, split_port_range
+from polatis.helper.port_table import PortTable
+from polatis.helper.tl1_parser import PortValuesConsumer, PortValuesParser
 
 
 class AutoloadActions(object):
@@ -11,21 +16,32 @@ class AutoloadActions(object):
     Autoload actions
     """
 
-    def __init__(self, cli_service, logger):
+    PATCH_PATTERN = re.compile(r'"(\d+),(\d+)"')
+    # ports per power and wavelength query, whole chassis is queried at once if 0
+    OPTICAL_CHUNK_SIZE = 0
+
+    def __init__(self, cli_service, logger, optical_chunk_size=OPTICAL_CHUNK_SIZE):
         """
         :param cli_service: default mode cli_service
         :type cli_service: CliService
         :param logger:
         :type logger: Logger
+        :param optical_chunk_size: ports per power and wavelength query, 0 for whole chassis
         :return:
         """
         self._cli_service = cli_service
         self._logger = logger
+        self._optical_chunk_size = optical_chunk_size
 
     def get_switch_serial(self):
         """ Determine Polatis Switch serial number """
 
-        output = CommandTemplateExecutor(self._cli_service, command_template.PSERIAL).execute_command()
+        output = command_template.PSERIAL.execute(self._cli_service, self._logger)
+        return self.parse_switch_serial(output)
+
+    def parse_switch_serial(self, output):
+        """ Parse RTRV-INV output """
+
         match = re.search(r"SN=(?P<serial>\w+)", output)
         if match:
             serial = match.groupdict()["serial"]
@@ -38,7 +54,12 @@ class AutoloadActions(object):
     def get_switch_details(self):
         """ Determine Polatis Switch detailed information like vendor, type, version, model """
 
-        output = CommandTemplateExecutor(self._cli_service, command_template.NETYPE).execute_command()
+        output = command_template.NETYPE.execute(self._cli_service, self._logger)
+        return self.parse_switch_details(output)
+
+    def parse_switch_details(self, output):
+        """ Parse RTRV-NETYPE output """
+
         match = re.search(r'"(?P<vendor>.*),(?P<model>.*),(?P<type>.*),(?P<version>.*)"', output)
         if not match:
             match = re.search(r'(?P<vendor>.*),(?P<model>.*),(?P<type>.*),(?P<version>.*)', output)
@@ -51,55 +72,139 @@ class AutoloadActions(object):
         else:
             self._logger.error("Unable to parse system info: {}".format(output))
 
-    def get_connections(self, logical_ports_count, is_logical=False):
-        """ Determine Polatis Switch connections """
+    def get_connections(self):
+        """ Determine Polatis Switch connections
+        :return: connections of switch ports for both directions, {src: dst, dst: src}
+        :rtype: dict
+        """
+
+        output = command_template.PATCH.execute(self._cli_service, self._logger)
+        return self.parse_connections(output)
+
+    def parse_connections(self, output):
+        """ Parse RTRV-PATCH output
+        :return: connections for both directions, {src: dst, dst: src}
+        :rtype: dict
+        """
 
         conn_info = {}
-        output = CommandTemplateExecutor(self._cli_service, command_template.PATCH).execute_command()
-        for src, dst in re.findall(r'"(\d+),(\d+)"', output):
-            conn_info.update({int(src): int(dst), int(dst): int(src)})
-
-        if is_logical:
-            conn_info_fixed = {}
-            for src, dst in conn_info.items():
-                if src > logical_ports_count:
-                    conn_info_fixed[src - logical_ports_count] = dst
-                elif dst > logical_ports_count:
-                    conn_info_fixed[dst - logical_ports_count] = src
-
-                conn_info = conn_info_fixed
-        
+        for src, dst in self.iter_connections(output):
+            conn_info.update({src: dst, dst: src})
         return conn_info
 
-    def get_port_status(self, size):
-        """ Determine ports status """
-
-        port_status = {}
-        try:
-            output = CommandTemplateExecutor(self._cli_service, command_template.SHUTTERS).execute_command(size=size)
-            for port, status in re.findall(r'"(?P<port>\d+):(?P<status>\S+)"', output):
-                port_status[int(port)] = status
-        finally:
-            return port_status
-
-    def get_port_power(self, ports_count):
-        """ Determine ports power """
-
-        port_power = {}
-        try:
-            output = CommandTemplateExecutor(self._cli_service, command_template.POWER).execute_command(size=ports_count)
-            for port, power in re.findall(r'"(?P<port>\d+):(?P<power>\S+)"', output):
-                port_power[int(port)] = power
-        finally:
-            return port_power
-
-    def get_port_wavelength(self, ports_count):
-        """ Determine ports wavelength """
-
-        port_wavelength = {}
-        try:
-            output = CommandTemplateExecutor(self._cli_service, command_template.WAVE).execute_command(size=ports_count)
-            for port, wave in re.findall(r'"(?P<port>\d+):(?P<wave>\S+?),.*"', output):
-                port_wavelength[int(port)] = wave
-        finally:
-            return port_wavelength
+    def iter_connections(self, output):
+        """ Parse RTRV-PATCH output
+        :return: iterator of (src, dst) patches
+        """
+
+        for match in self.PATCH_PATTERN.finditer(output):
+            yield int(match.group(1)), int(match.group(2))
+
+    def get_autoload_details(self, ports_count=None, connections=None, with_optical=True):
+        """ Retrieve all autoload information using pipelined commands
+        :param ports_count: total ports count, device size is retrieved first if not known
+        :param connections: known patch table {src: dst, dst: src}, RTRV-PATCH is skipped if defined
+        :param with_optical: retrieve ports power and wavelength
+        :return: dict with Serial, Details, Size and Ports keys,
+            Size is (size1, size2) if it was retrieved and None otherwise
+        :rtype: dict
+        """
+
+        pipeline = CommandPipeline(self._cli_service, self._logger)
+        inventory = self._add_inventory_commands(pipeline, with_size=not ports_count,
+                                                 with_connections=connections is None)
+        port_table = PortTable(ports_count) if ports_count else None
+        optical = {}
+        if port_table and with_optical:
+            optical = self._add_optical_commands(pipeline, self.optical_ranges(ports_count), port_table)
+
+        details = {"Size": None}
+        outputs = pipeline.execute()
+        self._parse_required(inventory, outputs, details)
+
+        if not port_table:
+            port_table = PortTable(sum(details["Size"]))
+            if with_optical:
+                optical = self._add_optical_commands(pipeline, self.optical_ranges(port_table.ports_count),
+                                                     port_table)
+                outputs = pipeline.execute()
+
+        self._check_optional(optical, outputs)
+        port_table.update_connections(details.pop("Connections") if connections is None else connections.items())
+        details["Ports"] = port_table
+        return details
+
+    def get_inventory_details(self, port_table, connections=None):
+        """ Retrieve serial, details and connections using pipelined commands
+        :param port_table: table to fill with connections
+        :type port_table: PortTable
+        :param connections: known patch table {src: dst, dst: src}, RTRV-PATCH is skipped if defined
+        :return: dict with Serial and Details keys
+        :rtype: dict
+        """
+
+        pipeline = CommandPipeline(self._cli_service, self._logger)
+        inventory = self._add_inventory_commands(pipeline, with_size=False, with_connections=connections is None)
+
+        details = {}
+        self._parse_required(inventory, pipeline.execute(), details)
+        port_table.update_connections(details.pop("Connections") if connections is None else connections.items())
+        return details
+
+    def get_optical_details(self, port_table, ranges=None):
+        """ Retrieve ports power and wavelength using pipelined commands
+        :param port_table: table to fill with ports power and wavelength
+        :type port_table: PortTable
+        :param ranges: (start, end) port ranges to query, whole table in chunks of optical chunk size by default
+        """
+
+        pipeline = CommandPipeline(self._cli_service, self._logger)
+        optical = self._add_optical_commands(pipeline, ranges or self.optical_ranges(port_table.ports_count),
+                                             port_table)
+        self._check_optional(optical, pipeline.execute())
+
+    def _add_inventory_commands(self, pipeline, with_size, with_connections=True):
+        commands = {"Serial": (pipeline.add(command_template.PSERIAL), self.parse_switch_serial),
+                    "Details": (pipeline.add(command_template.NETYPE), self.parse_switch_details)}
+        if with_connections:
+            commands["Connections"] = (pipeline.add(command_template.PATCH), self.iter_connections)
+        if with_size:
+            size_actions = SystemActions(self._cli_service, self._logger)
+            commands["Size"] = (pipeline.add(system_template.DEVICE_EQPT), size_actions.parse_device_size)
+        return commands
+
+    def optical_ranges(self, ports_count):
+        """ Port ranges of power and wavelength queries
+        :return: list of (start, end) tuples
+        """
+
+        return split_port_range(1, ports_count, self._optical_chunk_size)
+
+    def _add_optical_commands(self, pipeline, ranges, port_table):
+        """ Add power and wavelength queries, records are written to the table while responses are received
+        :return: dict of output indexes by key
+        """
+
+        power = [pipeline.add(command_template.POWER, ports=encode_port_range(*port_range),
+                              consumer=PortValuesConsumer(PortValuesParser(PortValuesParser.POWER_PATTERN),
+                                                          port_table.update_power))
+                 for port_range in ranges]
+        wavelength = [pipeline.add(command_template.WAVE, ports=encode_port_range(*port_range),
+                                   consumer=PortValuesConsumer(PortValuesParser(PortValuesParser.WAVELENGTH_PATTERN),
+                                                               port_table.update_wavelength))
+                      for port_range in ranges]
+        return {"Power": power, "Wavelength": wavelength}
+
+    def _parse_required(self, commands, outputs, details):
+        for key, (index, parser) in commands.items():
+            if isinstance(outputs[index], Exception):
+                raise outputs[index]
+            details[key] = parser(outputs[index])
+
+    def _check_optional(self, commands, outputs):
+        """ Log failed chunks of optional commands """
+
+        for key, indexes in commands.items():
+            for index in indexes:
+                if isinstance(outputs[index], Exception):
+                    self._logger.warn("Failed to retrieve ports {}: {}".format(key.lower(), outputs[index]))
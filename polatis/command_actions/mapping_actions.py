@@ -1,11 +1,18 @@
 #!/usr/bin/python
 # -*- coding: utf-8 -*-
 
+import re
+
+import polatis.command_templates.autoload as autoload_template
 import polatis.command_templates.mapping as command_template
-from cloudshell.cli.command_template.command_template_executor import CommandTemplateExecutor
+from polatis.cli.command_pipeline import CommandPipeline
+from polatis.helper.port_list import encode_port_list, encode_port_pairs
 
 
 class MappingActions(object):
+    # patches per ENT-PATCH command
+    MAX_BATCH_SIZE = 128
+
     def __init__(self, cli_service, logger):
         """ Mapping actions
         :param cli_service: default mode cli_service
@@ -24,28 +31,125 @@ class MappingActions(object):
         :return:
         """
 
-        executor = CommandTemplateExecutor(self._cli_service, command_template.PORT_MAP)
-        output = executor.execute_command(src_port=src_port, dst_port=dst_port)
+        return command_template.PORT_MAP.execute(self._cli_service, self._logger, src_port=src_port, dst_port=dst_port)
+
+    def map_uni_batch(self, pairs):
+        """ Unidirectional mapping of several port pairs in a single ENT-PATCH
+        :param pairs: list of (src_port, dst_port) tuples
+        :return:
+        """
+
+        src_ports = "&".join(str(src_port) for src_port, _ in pairs)
+        dst_ports = "&".join(str(dst_port) for _, dst_port in pairs)
+
+        try:
+            output = command_template.PORT_MAP_BATCH.execute(self._cli_service, self._logger,
+                                                             src_ports=src_ports, dst_ports=dst_ports)
+        except Exception as e:
+            failed_pairs = self._get_failed_pairs(pairs)
+            raise Exception("Failed to map ports {}: {}".format(
+                ", ".join("{}->{}".format(src_port, dst_port) for src_port, dst_port in failed_pairs or pairs), e))
         return output
 
+    def _get_failed_pairs(self, pairs):
+        """ Determine which of the requested pairs are not present in the patch table
+        :param pairs: list of (src_port, dst_port) tuples
+        :return: list of (src_port, dst_port) tuples
+        """
+
+        try:
+            output = autoload_template.PATCH.execute(self._cli_service, self._logger)
+        except Exception:
+            self._logger.exception("Failed to retrieve patch table")
+            return []
+
+        patched = set((int(src), int(dst)) for dst, src in re.findall(r'"(\d+),(\d+)"', output))
+        return [(src_port, dst_port) for src_port, dst_port in pairs if (src_port, dst_port) not in patched]
+
     def map_clear_to(self, port):
         """ Clear unidirectional mapping
         :param port:
         :return: 
         """
 
-        executor = CommandTemplateExecutor(self._cli_service, command_template.MAP_CLEAR)
-        output = executor.execute_command(port=port)
-        return output
+        return command_template.MAP_CLEAR.execute(self._cli_service, self._logger, port=port)
 
     def map_clear(self, ports):
-        """ Clear bidirectional mapping
-        :param ports:
+        """ Clear mappings of all ports in a single DLT-PATCH
+        :param ports: port numbers
         :return:
         """
 
-        port = "&".join(ports)
+        port = encode_port_list(ports)
+        return command_template.MAP_CLEAR.execute(self._cli_service, self._logger, port=port)
+
+    @staticmethod
+    def patches_diff(current, target, ports=None):
+        """ Minimal change of the patch table
+        :param current: current patches, set of (ingress, egress) tuples
+        :param target: required patches of the ports
+        :param ports: ports which patches are changed, ports of the target patches by default
+        :return: patches to delete and patches to add
+        :rtype: tuple
+        """
+
+        if ports is None:
+            ports = set(port for patch in target for port in patch)
+        deleted = set(patch for patch in current
+                      if patch not in target and (patch[0] in ports or patch[1] in ports))
+        added = set(target) - set(current)
+        return deleted, added
+
+    def apply_patches(self, current, target):
+        """ Change patches of the target ports with the minimal set of DLT-PATCH and ENT-PATCH commands,
+        previous patches of the changed ports are restored if any command fails,
+        the caller restores them on a new session if the session failed
+        :param current: current patches, set of (ingress, egress) tuples
+        :param target: required patches, set of (ingress, egress) tuples
+        :return: deleted and added patches
+        :rtype: tuple
+        """
+
+        deleted, added = self.patches_diff(current, target)
+        try:
+            self._send_patches(deleted, added)
+        except Exception as e:
+            if not self._cli_service.session.active():
+                raise
+            self._logger.error("Failed to apply patches, restoring previous ones: {}".format(e))
+            try:
+                self.restore_patches(current, target)
+            except Exception:
+                self._logger.exception("Failed to restore patches")
+            raise
+        return deleted, added
+
+    def _send_patches(self, deleted, added):
+        """ Send DLT-PATCH and range compressed ENT-PATCH batches in a single round-trip """
+
+        pipeline = CommandPipeline(self._cli_service, self._logger)
+        if deleted:
+            pipeline.add(command_template.MAP_CLEAR, port=encode_port_list(ingress for ingress, _ in deleted))
+        added = sorted(added)
+        for index in range(0, len(added), self.MAX_BATCH_SIZE):
+            ingress_ports, egress_ports = encode_port_pairs(added[index:index + self.MAX_BATCH_SIZE])
+            pipeline.add(command_template.PORT_MAP_BATCH, dst_ports=ingress_ports, src_ports=egress_ports)
+
+        errors = [str(output) for output in pipeline.execute() if isinstance(output, Exception)]
+        if errors:
+            raise Exception("Failed to apply patches: {}".format(", ".join(errors)))
+
+    def restore_patches(self, current, target):
+        """ Restore patches of the ports changed by apply_patches
+        :param current: patches passed to apply_patches
+        :param target: patches passed to apply_patches
+        :raises Exception: if patch table was not retrieved or restored
+        """
+
+        deleted, added = self.patches_diff(current, target)
+        ports = set(port for patch in deleted | added for port in patch)
+        previous = set(patch for patch in current if patch[0] in ports or patch[1] in ports)
 
-        executor = CommandTemplateExecutor(self._cli_service, command_template.MAP_CLEAR)
-        output = executor.execute_command(port=port)
-        return output
\ No newline at end of file
+        output = autoload_template.PATCH.execute(self._cli_service, self._logger)
+        patches = set((int(ingress), int(egress)) for ingress, egress in re.findall(r'"(\d+),(\d+)"', output))
+        self._send_patches(*self.patches_diff(patches, previous, ports))
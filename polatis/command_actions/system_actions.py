@@ -3,7 +3,6 @@
 
 import re
 import polatis.command_templates.system as command_template
-from cloudshell.cli.command_template.command_template_executor import CommandTemplateExecutor
 
 
 class SystemActions(object):
@@ -26,7 +25,16 @@ class SystemActions(object):
         :return:
         """
 
-        output = CommandTemplateExecutor(self._cli_service, command_template.DEVICE_EQPT).execute_command()
+        output = command_template.DEVICE_EQPT.execute(self._cli_service, self._logger)
+        return self.parse_device_size(output)
+
+    def parse_device_size(self, output):
+        """
+        Parse RTRV-EQPT SIZE output
+        :return: size1, size2
+        :rtype: tuple
+        """
+
         match = re.search(r"SYSTEM:SIZE=(?P<size1>\d+)x(?P<size2>\d+)", output)
         if match:
             size1 = int(match.groupdict()['size1'])
@@ -3,14 +3,14 @@
 
 from collections import OrderedDict
 
-from cloudshell.cli.command_template.command_template import CommandTemplate
+from polatis.cli.tl1_command import TL1Command
 
 # ACTION_MAP = OrderedDict()
 # ERROR_MAP = OrderedDict([(r'[Ee]rror:', 'Command error')])
 
-PSERIAL = CommandTemplate("RTRV-INV:\"<name>\":OCS:<counter>:;")
-NETYPE = CommandTemplate('RTRV-NETYPE:\"<name>\"::<counter>:;')
-PATCH = CommandTemplate("RTRV-PATCH:\"<name>\"::<counter>:;")
-SHUTTERS = CommandTemplate("RTRV-PORT-SHUTTER:\"<name>\":1&&{size}:<counter>:;")
-POWER = CommandTemplate("RTRV-PORT-POWER:\"<name>\":1&&{size}:<counter>:;")
-WAVE = CommandTemplate("RTRV-PORT-PMON:\"<name>\":1&&{size}:<counter>:;")
\ No newline at end of file
+PSERIAL = TL1Command("RTRV-INV", "OCS")
+NETYPE = TL1Command("RTRV-NETYPE")
+PATCH = TL1Command("RTRV-PATCH")
+SHUTTERS = TL1Command("RTRV-PORT-SHUTTER", "1&&{size}")
+POWER = TL1Command("RTRV-PORT-POWER", "{ports}")
+WAVE = TL1Command("RTRV-PORT-PMON", "{ports}")
\ No newline at end of file
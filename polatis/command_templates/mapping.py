@@ -3,7 +3,7 @@
 
 from collections import OrderedDict
 
-from cloudshell.cli.command_template.command_template import CommandTemplate
+from polatis.cli.tl1_command import TL1Command
 
 # ACTION_MAP = OrderedDict()
 # ERROR_MAP = OrderedDict(
@@ -16,5 +16,6 @@ from cloudshell.cli.command_template.command_template import CommandTemplate
 # MAP_CLEAR = CommandTemplate('map {port} clear-all', ACTION_MAP, ERROR_MAP)
 
 
-PORT_MAP = CommandTemplate("ENT-PATCH:\"<name>\":{dst_port},{src_port}:<counter>:;")
-MAP_CLEAR = CommandTemplate("DLT-PATCH:\"<name>\":{port}:<counter>:;")
+PORT_MAP = TL1Command("ENT-PATCH", "{dst_port},{src_port}")
+MAP_CLEAR = TL1Command("DLT-PATCH", "{port}")
+PORT_MAP_BATCH = TL1Command("ENT-PATCH", "{dst_ports},{src_ports}")
@@ -3,10 +3,11 @@
 
 from collections import OrderedDict
 
-from cloudshell.cli.command_template.command_template import CommandTemplate
+from polatis.cli.tl1_command import TL1Command
 
 # ACTION_MAP = OrderedDict()
 # ERROR_MAP = OrderedDict([(r'[Ee]rror:', 'Command error')])
 
-DEVICE_HDR = CommandTemplate("RTRV-HDR:::<counter>:;")
-DEVICE_EQPT = CommandTemplate("RTRV-EQPT:\"<name>\":SYSTEM:<counter>:::PARAMETER=SIZE;")
+DEVICE_HDR = TL1Command("RTRV-HDR", named=False)
+DEVICE_EQPT = TL1Command("RTRV-EQPT", "SYSTEM", "::PARAMETER=SIZE")
+ALLOW_MESSAGES = TL1Command("ALW-MSG-ALL")
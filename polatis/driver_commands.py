@@ -1,9 +1,13 @@
 #!/usr/bin/python
 # -*- coding: utf-8 -*-
+import hashlib
+import os
+import threading
+import time
+from multiprocessing.pool import ThreadPool
 
 from cloudshell.layer_one.core.driver_commands_interface import DriverCommandsInterface
-from cloudshell.layer_one.core.response.response_info import ResourceDescriptionResponseInfo, GetStateIdResponseInfo, \
-    AttributeValueResponseInfo
+from cloudshell.layer_one.core.response.response_info import GetStateIdResponseInfo, AttributeValueResponseInfo
 from cloudshell.layer_one.core.response.resource_info.entities.chassis import Chassis
 from cloudshell.layer_one.core.response.resource_info.entities.port import Port
 
@@ -11,12 +15,49 @@ from polatis.command_actions.autoload_actions import AutoloadActions
 from polatis.command_actions.mapping_actions import MappingActions
 from polatis.command_actions.system_actions import SystemActions
 
+from polatis.cli.patch_monitor import PatchMonitor
 from polatis.cli.polatis_cli_handler import PolatisCliHandler
+from polatis.helper.command_metrics import METRICS, measured_command
+from polatis.helper.device_profile_cache import DeviceProfileCache
+from polatis.helper.device_registry import DeviceAttribute, DeviceRegistry, device_command
+from polatis.helper.port_index import PortIndex
+from polatis.helper.port_list import split_port_range
+from polatis.helper.port_table import PortTable
+from polatis.helper.resource_description import StreamingResourceDescriptionResponseInfo
+from polatis.helper.trace_buffer import TRACE
 
 
 class DriverCommands(DriverCommandsInterface):
     """ Driver commands implementation """
     LOGICAL_PORT_MODE = "LOGICAL"
+    OPTICAL_SNAPSHOT_TTL = 10
+    METRICS_INTERVAL = 60
+    WARMUP = True
+    PREFETCH_TTL = 5
+    PATCH_MONITOR = False
+    # ports power and wavelength in autoload, queried inline, taken from the last snapshot or skipped
+    OPTICAL_INLINE = "INLINE"
+    OPTICAL_DEFERRED = "DEFERRED"
+    OPTICAL_SKIP = "SKIP"
+    WAVELENGTH_ATTRIBUTE = "Wavelength"
+    TX_POWER_ATTRIBUTE = "Tx Power (dBm)"
+    RX_POWER_ATTRIBUTE = "Rx Power (dBm)"
+
+    _cli_handler = DeviceAttribute("cli_handler")
+    _address = DeviceAttribute("address")
+    total_ports_count = DeviceAttribute("total_ports_count")
+    logical_ports_count = DeviceAttribute("logical_ports_count")
+    _port_index = DeviceAttribute("port_index")
+    serial_number = DeviceAttribute("serial_number")
+    _state_id = DeviceAttribute("state_id")
+    _state_token = DeviceAttribute("state_token")
+    _optical_snapshot = DeviceAttribute("optical_snapshot")
+    _optical_snapshot_time = DeviceAttribute("optical_snapshot_time")
+    _optical_snapshot_lock = DeviceAttribute("optical_snapshot_lock")
+    _patch_table = DeviceAttribute("patch_table")
+    _patch_table_time = DeviceAttribute("patch_table_time")
+    _patch_changes = DeviceAttribute("patch_changes")
+    _patch_monitor = DeviceAttribute("patch_monitor")
 
     def __init__(self, logger, runtime_config):
         """
@@ -27,9 +68,23 @@ class DriverCommands(DriverCommandsInterface):
         self._logger = logger
         self._runtime_config = runtime_config
         self._driver_port_mode = runtime_config.read_key('DRIVER.PORT_MODE', self.LOGICAL_PORT_MODE)
-        self._cli_handler = PolatisCliHandler(logger)
-        self.total_ports_count = None
-        self.logical_ports_count = None
+        self._devices = DeviceRegistry(lambda: PolatisCliHandler(logger))
+        self._profile_cache = DeviceProfileCache(
+            runtime_config.read_key('DRIVER.PROFILE_CACHE_PATH',
+                                    os.path.join(os.environ.get('LOG_PATH', ''), 'polatis', 'device_profiles.json')),
+            logger)
+        self._metrics_interval = runtime_config.read_key('DRIVER.METRICS_INTERVAL', self.METRICS_INTERVAL)
+        self._metrics_path = os.path.join(os.environ.get('LOG_PATH', ''), 'polatis', 'metrics.json')
+        self._trace_size = runtime_config.read_key('LOGGING.TRACE_SIZE', TRACE.SIZE)
+        self._optical_snapshot_ttl = runtime_config.read_key('DRIVER.OPTICAL_SNAPSHOT_TTL', self.OPTICAL_SNAPSHOT_TTL)
+        self._warmup = runtime_config.read_key('DRIVER.WARMUP', self.WARMUP)
+        self._prefetch_ttl = runtime_config.read_key('DRIVER.PREFETCH_TTL', self.PREFETCH_TTL)
+        self._patch_monitor_enabled = runtime_config.read_key('DRIVER.PATCH_MONITOR', self.PATCH_MONITOR)
+        self._patch_resync_interval = runtime_config.read_key('DRIVER.PATCH_RESYNC_INTERVAL',
+                                                              PatchMonitor.RESYNC_INTERVAL)
+        self._autoload_optical = str(runtime_config.read_key('DRIVER.AUTOLOAD_OPTICAL', self.OPTICAL_INLINE)).upper()
+        self._optical_chunk_size = runtime_config.read_key('DRIVER.OPTICAL_CHUNK_SIZE',
+                                                           AutoloadActions.OPTICAL_CHUNK_SIZE)
 
     @property
     def _is_logical_port_mode(self):
@@ -43,13 +98,317 @@ class DriverCommands(DriverCommandsInterface):
 
         if not self.total_ports_count or not self.logical_ports_count:
             system_actions = SystemActions(session, self._logger)
-            size1, size2 = system_actions.get_device_size()
-
-            self.total_ports_count = size1 + size2
-            self.logical_ports_count = min(size1, size2)
+            self._set_device_size(*system_actions.get_device_size())
 
         return self.total_ports_count, self.logical_ports_count
 
+    def _get_port_index(self, session=None):
+        """ Port address translation of the current device size and port mode
+        :param session: session to determine device size if it is not known
+        :rtype: PortIndex
+        """
+
+        if not self._port_index:
+            total_ports_count, logical_ports_count = self._get_device_size(session=session)
+            self._port_index = PortIndex(total_ports_count, logical_ports_count, is_logical=self._is_logical_port_mode)
+        return self._port_index
+
+    def _set_device_size(self, size1, size2):
+        self.total_ports_count = size1 + size2
+        self.logical_ports_count = min(size1, size2)
+        self._port_index = None
+        self._profile_cache.update(self._address, size=[size1, size2])
+
+    def _load_device_profile(self, session, serial_number):
+        """ Use cached device profile if it belongs to the same device, refresh it otherwise """
+
+        profile = self._profile_cache.get(self._address)
+        self.total_ports_count = self.logical_ports_count = self._port_index = None
+        if profile.get("serial") != serial_number:
+            if profile:
+                self._logger.info("Device serial was changed, dropping cached device profile")
+                self._profile_cache.remove(self._address)
+        elif profile.get("size"):
+            self._set_device_size(*profile["size"])
+
+        self._profile_cache.update(self._address,
+                                   serial=serial_number,
+                                   switch_name=getattr(session.session, "switch_name", None),
+                                   transport=self._cli_handler.transport)
+
+    def _run_concurrently(self, *functions):
+        """ Run functions concurrently, each function gets its own session
+        :param functions: callables taking session as the only argument
+        :return: results in functions order
+        :rtype: list
+        """
+
+        driver_command = METRICS.driver_command
+        device = self._devices.current
+        thread_pool = ThreadPool(len(functions))
+        try:
+            results = [thread_pool.apply_async(self._run_in_session, (function, driver_command, device))
+                       for function in functions]
+            return [result.get() for result in results]
+        finally:
+            thread_pool.close()
+
+    def _run_in_session(self, function, driver_command=None, device=None):
+        with METRICS.command_context(driver_command or METRICS.driver_command), \
+                self._devices.activate(device or self._devices.current, exclusive=False):
+            with self._cli_handler.default_mode_service() as session:
+                return function(session)
+
+    def _get_autoload_details(self):
+        """ Retrieve autoload information, query groups run on separate sessions if pool allows
+        :rtype: dict
+        """
+
+        connections = self._get_known_connections()
+        with_optical = self._autoload_optical not in (self.OPTICAL_DEFERRED, self.OPTICAL_SKIP)
+        if self._cli_handler.session_pool_size > 1:
+            if not self.total_ports_count:
+                self._run_in_session(self._get_device_size)
+            total_ports_count = self.total_ports_count
+
+            port_table = PortTable(total_ports_count)
+            functions = [lambda session: AutoloadActions(session, self._logger).get_inventory_details(port_table,
+                                                                                                      connections)]
+            if with_optical:
+                functions.extend(self._optical_functions(port_table, self._cli_handler.session_pool_size - 1))
+            autoload_details = self._run_concurrently(*functions)[0]
+            autoload_details["Ports"] = port_table
+        else:
+            with self._cli_handler.default_mode_service() as session:
+                autoload_actions = AutoloadActions(session, self._logger, self._optical_chunk_size)
+                autoload_details = autoload_actions.get_autoload_details(ports_count=self.total_ports_count,
+                                                                         connections=connections,
+                                                                         with_optical=with_optical)
+            if autoload_details["Size"]:
+                self._set_device_size(*autoload_details["Size"])
+
+        if self._autoload_optical == self.OPTICAL_DEFERRED:
+            snapshot = self._optical_snapshot
+            if snapshot and snapshot.ports_count == autoload_details["Ports"].ports_count:
+                autoload_details["Ports"].copy_optical(snapshot)
+            self._start_optical_refresh()
+        return autoload_details
+
+    def _optical_functions(self, port_table, sessions):
+        """ Functions filling ports power and wavelength of the port table,
+        port range chunks are spread across the functions
+        :param sessions: maximum functions count
+        :return: callables taking session as the only argument
+        :rtype: list
+        """
+
+        ranges = split_port_range(1, port_table.ports_count, self._optical_chunk_size)
+        sessions = max(min(sessions, len(ranges)), 1)
+        return [lambda session, group=ranges[index::sessions]:
+                AutoloadActions(session, self._logger).get_optical_details(port_table, group)
+                for index in range(sessions)]
+
+    @staticmethod
+    def _format_value(value):
+        """ Format numeric attribute value without losing digits, None if value is not defined,
+        1550.125 -> '1550.125', -7.0 -> '-7'
+        """
+
+        if value is not None:
+            value = repr(value)
+            return value[:-2] if value.endswith(".0") else value
+
+    def _get_optical_snapshot(self):
+        """ Whole chassis power and wavelength, shared by all callers within TTL
+        :rtype: PortTable
+        """
+
+        with self._optical_snapshot_lock:
+            if not self._optical_snapshot or time.time() - self._optical_snapshot_time > self._optical_snapshot_ttl:
+                if not self.total_ports_count:
+                    self._run_in_session(self._get_device_size)
+                port_table = PortTable(self.total_ports_count)
+                functions = self._optical_functions(port_table, self._cli_handler.session_pool_size)
+                if len(functions) > 1:
+                    self._run_concurrently(*functions)
+                else:
+                    self._run_in_session(functions[0])
+                self._optical_snapshot = port_table
+                self._optical_snapshot_time = time.time()
+            return self._optical_snapshot
+
+    def _start_optical_refresh(self):
+        """ Refresh outdated optical snapshot of the current switch in a background thread """
+
+        if self._optical_snapshot and time.time() - self._optical_snapshot_time <= self._optical_snapshot_ttl:
+            return
+        thread = threading.Thread(target=self._refresh_optical_snapshot, args=(self._devices.current,),
+                                  name="PolatisOpticalRefresh")
+        thread.daemon = True
+        thread.start()
+
+    def _refresh_optical_snapshot(self, device):
+        """
+        :type device: polatis.helper.device_registry.DeviceContext
+        """
+
+        try:
+            with METRICS.command_context("optical_refresh"), self._devices.activate(device, exclusive=False):
+                self._get_optical_snapshot()
+        except Exception as e:
+            self._logger.warn("Optical snapshot refresh of {} failed: {}".format(device.address, e))
+
+    def _get_switch_serial(self, session):
+        """ Determine switch serial number
+        return: serial number
+        rtype: str
+        """
+
+        if not self.serial_number:
+            autoload_actions = AutoloadActions(session, self._logger)
+            self.serial_number = autoload_actions.get_switch_serial()
+
+        return self.serial_number
+
+    def _get_mirrored_connections(self):
+        """ Patch table mirrored by the patch monitor, None if the monitor is not running or not synchronized
+        :rtype: dict
+        """
+
+        return self._patch_monitor.connections if self._patch_monitor else None
+
+    def _get_known_connections(self):
+        """ Patch table known without querying the switch, mirrored one if it is synchronized,
+        the one prefetched after login is used once if it is not older than prefetch TTL
+        :return: connections for both directions, {src: dst, dst: src}, None if not known
+        :rtype: dict
+        """
+
+        connections = self._get_mirrored_connections()
+        if connections is not None:
+            return connections
+
+        patch_table, self._patch_table = self._patch_table, None
+        if patch_table is not None and time.time() - self._patch_table_time <= self._prefetch_ttl:
+            return patch_table
+        return None
+
+    def _get_connections(self, session=None):
+        """ Patch table, it is read from the switch only if it is not known, see _get_known_connections
+        :param session: session to read the patch table, new one is opened if not defined
+        :return: connections for both directions, {src: dst, dst: src}
+        :rtype: dict
+        """
+
+        connections = self._get_known_connections()
+        if connections is not None:
+            return connections
+
+        if session is None:
+            with self._cli_handler.default_mode_service() as session:
+                return AutoloadActions(session, self._logger).get_connections()
+        return AutoloadActions(session, self._logger).get_connections()
+
+    def _device_changed(self, session):
+        """ Patch table was changed by the driver, prefetched and mirrored patch tables are out of date,
+        state token is rebuilt right away so that later changes made outside the driver are detected
+        :param session: session which changed the patch table
+        """
+
+        self._state_token = None
+        self._patch_table = None
+        self._patch_changes += 1
+        if self._patch_monitor:
+            self._patch_monitor.invalidate()
+
+        if self._state_id is not None:
+            try:
+                self._state_token = self._get_state_token(session=session)
+            except Exception as e:
+                self._logger.warn("Unable to rebuild state token, state id is out of date: {}".format(e))
+
+    def _start_patch_monitor(self):
+        """ Mirror patch table of the current switch if patch monitor is enabled and TL1 session type is configured """
+
+        if not self._patch_monitor_enabled or "TL1" not in self._cli_handler.session_types:
+            return
+        if self._patch_monitor and self._patch_monitor.running:
+            return
+
+        cli_handler = self._cli_handler
+        self._patch_monitor = PatchMonitor(lambda: cli_handler.create_session("TL1"), self._logger,
+                                           self._patch_resync_interval)
+        self._patch_monitor.start()
+
+    def _start_warmup(self):
+        """ Prepare the current switch for the first driver command in a background thread """
+
+        if self._warmup and self._needs_warm_up():
+            thread = threading.Thread(target=self._warm_up, args=(self._devices.current,), name="PolatisWarmup")
+            thread.daemon = True
+            thread.start()
+
+    def _needs_warm_up(self):
+        """ Current switch is cold if its size is not known, with several pooled sessions also
+        if the pool is not filled or the patch table is neither mirrored nor prefetched
+        :rtype: bool
+        """
+
+        if not self.total_ports_count:
+            return True
+        if self._cli_handler.session_pool_size <= 1:
+            return False
+        return (self._cli_handler.sessions_count < self._cli_handler.session_pool_size or
+                self._get_mirrored_connections() is None and
+                (self._patch_table is None or time.time() - self._patch_table_time > self._prefetch_ttl))
+
+    def _warm_up(self, device):
+        """ Prefetch device size, with several pooled sessions also prefetch patch table and open authenticated
+        sessions up to the pool size, driver commands are not blocked,
+        prefetched patch table is dropped if the driver changed it meanwhile
+        :type device: polatis.helper.device_registry.DeviceContext
+        """
+
+        # the only pooled session is left to the next driver command which reads the patch table itself
+        prefetch = self._cli_handler.session_pool_size > 1
+        try:
+            with METRICS.command_context("warm_up"), self._devices.activate(device, exclusive=False):
+                with self._cli_handler.default_mode_service() as session:
+                    self._get_device_size(session=session)
+                    if prefetch:
+                        patch_changes = self._patch_changes
+                        patch_table_time = time.time()
+                        patch_table = AutoloadActions(session, self._logger).get_connections()
+
+                if prefetch:
+                    # driver commands change the patch table under the device lock
+                    with device.lock:
+                        if self._patch_changes == patch_changes:
+                            self._patch_table, self._patch_table_time = patch_table, patch_table_time
+
+                    # pooled sessions are only connected, the switch state is not touched
+                    self._run_concurrently(*[lambda session: None] * self._cli_handler.session_pool_size)
+        except Exception as e:
+            self._logger.warn("Warm-up of {} failed: {}".format(device.address, e))
+
+    def _get_state_token(self, session=None):
+        """ Build device state token, digest of the patch table and the chassis serial
+        :param session: session to query the switch, new one is opened if needed and not defined
+        return: state token
+        rtype: str
+        """
+
+        if session is None and (not self.serial_number or self._get_mirrored_connections() is None):
+            with self._cli_handler.default_mode_service() as session:
+                return self._get_state_token(session=session)
+
+        connections = self._get_connections(session)
+
+        digest = hashlib.md5(self._get_switch_serial(session=session))
+        digest.update(str(sorted(connections.items())))
+        return digest.hexdigest()
+
+    @measured_command
     def login(self, address, username, password):
         """
         Perform login operation on the device
@@ -69,11 +428,26 @@ class DriverCommands(DriverCommandsInterface):
                 self._logger.info(device_info)
         """
 
-        self._cli_handler.define_session_attributes(address, username, password)
-        with self._cli_handler.default_mode_service() as session:
-            actions = AutoloadActions(session, self._logger)
-            self._logger.info(actions.get_switch_serial())
+        METRICS.start_dump(self._metrics_path, self._metrics_interval, self._logger)
+        TRACE.resize(self._trace_size)
 
+        # each switch has its own cli handler and device state, the last logged in switch is the default one
+        with self._devices.activate(self._devices.register(address)):
+            self._cli_handler.define_session_attributes(address, username, password)
+            if not self._cli_handler.transport:
+                self._cli_handler.transport = self._profile_cache.get(address).get("transport")
+
+            with self._cli_handler.default_mode_service() as session:
+                actions = AutoloadActions(session, self._logger)
+                self.serial_number = actions.get_switch_serial()
+                self._logger.info(self.serial_number)
+                self._load_device_profile(session, self.serial_number)
+
+            self._start_warmup()
+            self._start_patch_monitor()
+
+    @measured_command
+    @device_command()
     def get_resource_description(self, address):
         """ Auto-load function to retrieve all information from the device
         :param address: resource address, '192.168.42.240'
@@ -107,57 +481,47 @@ class DriverCommands(DriverCommandsInterface):
             return ResourceDescriptionResponseInfo([chassis])
         """
 
-        with self._cli_handler.default_mode_service() as session:
-            autoload_actions = AutoloadActions(session, self._logger)
+        start_time = time.time()
+        autoload_details = self._get_autoload_details()
 
-            serial_number = autoload_actions.get_switch_serial()
-            switch_details = autoload_actions.get_switch_details()
+        serial_number = self.serial_number = autoload_details["Serial"]
+        switch_details = autoload_details["Details"]
 
-            chassis = Chassis("", address, "Polatis Chassis", serial_number)
-            chassis.set_model_name(switch_details["Model"])
-            chassis.set_os_version(switch_details["Version"])
-            chassis.set_serial_number(serial_number)
+        chassis = Chassis("", address, "Polatis Chassis", serial_number)
+        chassis.set_model_name(switch_details["Model"])
+        chassis.set_os_version(switch_details["Version"])
+        chassis.set_serial_number(serial_number)
+        self._profile_cache.update(self._address, model=switch_details["Model"], version=switch_details["Version"])
 
-            total_ports_count, logical_ports_count = self._get_device_size(session=session)
+        port_table = autoload_details["Ports"]
+        port_index = self._get_port_index()
 
-            connections = autoload_actions.get_connections(logical_ports_count=logical_ports_count,
-                                                           is_logical=self._is_logical_port_mode)
+        self._logger.debug("Logical port mode: %s", port_index.is_logical)
 
-            ports_power = autoload_actions.get_port_power(ports_count=total_ports_count)
-            ports_wavelength = autoload_actions.get_port_wavelength(ports_count=total_ports_count)
+        ports_len = len(str(self.total_ports_count))
 
-            self._logger.debug("PORT MODE: {}".format(self._is_logical_port_mode))
+        def iter_ports():
+            """ Ports are created while the response is serialized """
 
-            ports = {}
-            ports_len = len(str(total_ports_count))
-            for port_addr in range(1, (logical_ports_count if self._is_logical_port_mode else total_ports_count) + 1):
+            for port_addr, mapped_port, wavelength, tx_power, rx_power in port_table.iter_ports(port_index):
 
                 port_serial = "{sw_serial}.{port_addr}".format(sw_serial=serial_number, port_addr=port_addr)
                 port_id = "{:0{}d}".format(port_addr, ports_len)
-                self._logger.debug("Port id : {}".format(port_id))
                 port = Port(port_id, "Generic L1 Port", port_serial)
 
-                ports[port_addr] = port
-                port.set_parent_resource(chassis)
-                port.set_wavelength(ports_wavelength.get(port_addr, 0))
-
-                if self._is_logical_port_mode:
-                    port.set_tx_power(ports_power.get(port_addr, 0))
-                    port.set_rx_power(ports_power.get(port_addr + logical_ports_count, 0))
+                port.set_wavelength(self._format_value(wavelength))
+                port.set_tx_power(self._format_value(tx_power))
+                port.set_rx_power(self._format_value(rx_power))
+                if 0 < mapped_port <= port_index.ports_count:
+                    yield port, "{:0{}d}".format(mapped_port, ports_len)
                 else:
-                    port_power = ports_power.get(port_addr, 0)
-                    if port_addr <= logical_ports_count:
-                        port.set_tx_power(port_power)
-                    else:
-                        port.set_rx_power(port_power)
-
-            for src_address, dst_address in connections.iteritems():
-                src_port = ports.get(src_address)
-                dst_port = ports.get(dst_address)
-                src_port.add_mapping(dst_port)
+                    yield port, None
 
-            return ResourceDescriptionResponseInfo([chassis])
+        TRACE.event("AUTOLOAD", "1&&{}".format(port_index.ports_count), time.time() - start_time, "COMPLD")
+        return StreamingResourceDescriptionResponseInfo(chassis, iter_ports)
 
+    @measured_command
+    @device_command()
     def map_uni(self, src_port, dst_ports):
         """ Unidirectional mapping of two ports
         :param src_port: src port address, '192.168.42.240/1/21'
@@ -168,20 +532,17 @@ class DriverCommands(DriverCommandsInterface):
         :raises Exception: if command failed
         """
 
-        if self._is_logical_port_mode:
-            with self._cli_handler.default_mode_service() as session:
-                mapping_actions = MappingActions(session, self._logger)
-
-                _, logical_ports_count = self._get_device_size(session=session)
-
-                src = int(src_port.split('/')[-1]) + logical_ports_count
-                for dst_port in dst_ports:
-                    dst = int(dst_port.split('/')[-1])
-                    mapping_actions.map_uni(src, dst)
-
-        else:
+        if not self._is_logical_port_mode:
             raise Exception("Unidirectional connection is not available in physical port mode")
 
+        with self._cli_handler.default_mode_service() as session:
+            port_index = self._get_port_index(session=session)
+            patches = [port_index.uni_patch(src_port, dst_port) for dst_port in dst_ports]
+            MappingActions(session, self._logger).map_uni_batch([(egress, ingress) for ingress, egress in patches])
+            self._device_changed(session)
+
+    @measured_command
+    @device_command()
     def map_bidi(self, src_port, dst_port):
         """ Create a bidirectional connection between source and destination ports
         :param src_port: src port address, '192.168.42.240/1/21'
@@ -194,21 +555,75 @@ class DriverCommands(DriverCommandsInterface):
 
         with self._cli_handler.default_mode_service() as session:
             mapping_actions = MappingActions(session, self._logger)
-
-            src = int(src_port.split('/')[-1])
-            dst = int(dst_port.split('/')[-1])
-
-            total_ports_count, logical_ports_count = self._get_device_size(session=session)
+            patches = self._get_port_index(session=session).bidi_patches(src_port, dst_port)
 
             if self._is_logical_port_mode:
-                for a, b in [(dst, src), (src, dst)]:
-                    b += logical_ports_count
-                    # lower number must be the first in the command
-                    mapping_actions.map_uni(src_port=b, dst_port=a)
-                    # self._connection.command("ENT-PATCH:{name}:%d,%d:{counter}:;" % (a, b))
+                mapping_actions.map_uni_batch([(egress, ingress) for ingress, egress in patches])
             else:
-                mapping_actions.map_uni(src_port=max(src, dst), dst_port=min(src, dst))
+                ingress, egress = patches[0]
+                mapping_actions.map_uni(src_port=egress, dst_port=ingress)
+            self._device_changed(session)
+
+    @measured_command
+    @device_command()
+    def apply_connections(self, connections, bidirectional=True):
+        """ Apply connection set with the minimal number of patch commands,
+        previous connections of the affected ports are restored if any command fails
+        :param connections: list of (src_port, dst_port) addresses,
+            [('192.168.42.240/1/21', '192.168.42.240/1/22'), ('192.168.42.240/1/23', '192.168.42.240/1/24')]
+        :type connections: list
+        :param bidirectional: connections are bidirectional, unidirectional otherwise
+        :type bidirectional: bool
+        :return: None
+        :raises Exception: if command failed
+        """
+
+        if not connections:
+            return
+
+        patches = None
+        try:
+            with self._cli_handler.default_mode_service() as session:
+                port_index = self._get_port_index(session=session)
 
+                target = set()
+                for src_port, dst_port in connections:
+                    if bidirectional:
+                        target.update(port_index.bidi_patches(src_port, dst_port))
+                    else:
+                        target.add(port_index.uni_patch(src_port, dst_port))
+
+                connections = self._get_connections(session)
+                patches = set((src, dst) for src, dst in connections.items() if src < dst), target
+                try:
+                    MappingActions(session, self._logger).apply_patches(*patches)
+                finally:
+                    self._device_changed(session)
+        except Exception as e:
+            if patches and not session.session.active():
+                self._restore_patches(patches, e)
+            raise
+
+    def _restore_patches(self, patches, error):
+        """ Restore patches changed by apply_connections on a new session after its session failed
+        :param patches: current and target patches passed to apply_patches
+        :param error: exception of the failed session
+        :raises Exception: if patches were not restored
+        """
+
+        self._logger.error("Session failed while applying patches, restoring previous ones: {}".format(error))
+        try:
+            with self._cli_handler.default_mode_service() as session:
+                try:
+                    MappingActions(session, self._logger).restore_patches(*patches)
+                finally:
+                    self._device_changed(session)
+        except Exception as e:
+            self._logger.exception("Failed to restore patches")
+            raise Exception("Failed to apply patches: {}, rollback not performed: {}".format(error, e))
+
+    @measured_command
+    @device_command()
     def map_clear_to(self, src_port, dst_ports):
         """ Remove simplex/multi-cast/duplex connection ending on the destination port
         :param src_port: src port address, '192.168.42.240/1/21'
@@ -219,18 +634,17 @@ class DriverCommands(DriverCommandsInterface):
         :raises Exception: if command failed
         """
 
-        with self._cli_handler.default_mode_service() as session:
-            mapping_actions = MappingActions(session, self._logger)
-            src = int(src_port.split('/')[-1])
-            for dst_port in dst_ports:
-                dst = int(dst_port.split('/')[-1])
+        if not dst_ports:
+            return
 
-                if self._is_logical_port_mode:
-                    port = dst
-                else:
-                    port = min(src, dst)
-                mapping_actions.map_clear_to(port=port)
+        with self._cli_handler.default_mode_service() as session:
+            port_index = self._get_port_index(session=session)
+            ports = [port_index.clear_to_port(src_port, dst_port) for dst_port in dst_ports]
+            MappingActions(session, self._logger).map_clear(ports=ports)
+            self._device_changed(session)
 
+    @measured_command
+    @device_command()
     def map_clear(self, ports):
         """
         Remove simplex/multi-cast/duplex connection ending on the destination port
@@ -251,17 +665,14 @@ class DriverCommands(DriverCommandsInterface):
                     raise Exception('self.__class__.__name__', ','.join(exceptions))
         """
 
-        with self._cli_handler.default_mode_service() as session:
-            mapping_actions = MappingActions(session, self._logger)
-            for port in ports:
-                port = int(port.split('/')[-1])
-                if self._is_logical_port_mode:
-                    total_ports_count, logical_ports_count = self._get_device_size(session=session)
-
-                    mapping_actions.map_clear(ports=[port, port + logical_ports_count])
+        if not ports:
+            return
 
-                else:
-                    mapping_actions.map_clear_to(port=port)
+        with self._cli_handler.default_mode_service() as session:
+            port_index = self._get_port_index(session=session)
+            switch_ports = [switch_port for port in ports for switch_port in port_index.clear_ports(port)]
+            MappingActions(session, self._logger).map_clear(ports=switch_ports)
+            self._device_changed(session)
 
     def map_tap(self, src_port, dst_ports):
         """
@@ -289,6 +700,8 @@ class DriverCommands(DriverCommandsInterface):
         """
         raise NotImplementedError
 
+    @measured_command
+    @device_command()
     def get_attribute_value(self, cs_address, attribute_name):
         """
         Retrieve attribute value from the device
@@ -306,7 +719,17 @@ class DriverCommands(DriverCommandsInterface):
                 value = session.send_command(command)
                 return AttributeValueResponseInfo(value)
         """
-        raise NotImplementedError
+
+        attribute_index = {self.WAVELENGTH_ATTRIBUTE: 2,
+                           self.TX_POWER_ATTRIBUTE: 3,
+                           self.RX_POWER_ATTRIBUTE: 4}.get(attribute_name)
+        if attribute_index is None:
+            raise Exception("Attribute {} is not supported".format(attribute_name))
+
+        port_table = self._get_optical_snapshot()
+        port_index = self._get_port_index()
+        port_info = port_table.get_port(port_index.port(cs_address), port_index)
+        return AttributeValueResponseInfo(self._format_value(port_info[attribute_index]))
 
     def set_attribute_value(self, cs_address, attribute_name, attribute_value):
         """
@@ -329,6 +752,8 @@ class DriverCommands(DriverCommandsInterface):
         """
         raise NotImplementedError
 
+    @measured_command
+    @device_command(addressed=False)
     def get_state_id(self):
         """
         Check if CS synchronized with the device.
@@ -345,8 +770,18 @@ class DriverCommands(DriverCommandsInterface):
         """
 
         self._logger.info("Command 'get state id' called")
-        return GetStateIdResponseInfo("-1")
+        if self._state_id is None:
+            return GetStateIdResponseInfo("-1")
+
+        # state token is not known if it could not be rebuilt after the driver changed the patch table
+        if self._state_token is None or self._get_state_token() != self._state_token:
+            self._logger.info("Device state was changed, state id is out of date")
+            return GetStateIdResponseInfo("-1")
+
+        return GetStateIdResponseInfo(self._state_id)
 
+    @measured_command
+    @device_command(addressed=False)
     def set_state_id(self, state_id):
         """
         Set synchronization state id to the device, called after Autoload or SyncFomDevice commands
@@ -363,4 +798,5 @@ class DriverCommands(DriverCommandsInterface):
         """
 
         self._logger.info('set_state_id {}'.format(state_id))
-        # raise NotImplementedError
+        self._state_token = self._get_state_token()
+        self._state_id = state_id
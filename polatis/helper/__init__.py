@@ -0,0 +1,5 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from pkgutil import extend_path
+__path__ = extend_path(__path__, __name__)
\ No newline at end of file
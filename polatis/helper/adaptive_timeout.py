@@ -0,0 +1,72 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import threading
+
+
+class AdaptiveTimeout(object):
+    """ Read timeout per TL1 verb and command size derived from observed latency,
+    smoothed latency plus four mean deviations and a margin, not more than the session timeout,
+    commands of the same verb are estimated separately per power of two of their ports count
+    """
+
+    ALPHA = 0.125
+    BETA = 0.25
+    DEVIATIONS = 4
+    MARGIN = 1
+    MIN_TIMEOUT = 2
+
+    def __init__(self, min_timeout=MIN_TIMEOUT, margin=MARGIN):
+        """
+        :param min_timeout: seconds, lower limit of adaptive timeout, 0 to always use the session timeout
+        :param margin: seconds added to the latency estimate
+        """
+
+        self._lock = threading.Lock()
+        # (verb, size class): [smoothed latency, mean deviation]
+        self._estimates = {}
+        self.min_timeout = min_timeout
+        self.margin = margin
+
+    @staticmethod
+    def _key(verb, ports):
+        """ Estimate key, ports counts of the same power of two share the estimate """
+
+        return verb, int(ports).bit_length()
+
+    def timeout(self, verb, max_timeout, ports=0):
+        """ Read timeout of the command
+        :param verb: TL1 verb, RTRV-HDR
+        :param max_timeout: session timeout, used if latency of the command size is not known yet
+        :param ports: ports or port pairs count of the command
+        :rtype: float
+        """
+
+        estimate = self._estimates.get(self._key(verb, ports))
+        if not self.min_timeout or not estimate:
+            return max_timeout
+        smoothed, deviation = estimate
+        return min(max(smoothed + self.DEVIATIONS * deviation + self.margin, self.min_timeout), max_timeout)
+
+    def update(self, verb, duration, ports=0):
+        """ Add latency of completed command
+        :param verb: TL1 verb
+        :param duration: seconds
+        :param ports: ports or port pairs count of the command
+        """
+
+        key = self._key(verb, ports)
+        with self._lock:
+            estimate = self._estimates.get(key)
+            if not estimate:
+                self._estimates[key] = [duration, duration / 2]
+            else:
+                estimate[1] += self.BETA * (abs(duration - estimate[0]) - estimate[1])
+                estimate[0] += self.ALPHA * (duration - estimate[0])
+
+    def backoff(self, verb):
+        """ Command was not completed, the verb uses the session timeout until its latency is observed again """
+
+        with self._lock:
+            for key in [key for key in self._estimates if key[0] == verb]:
+                del self._estimates[key]
@@ -0,0 +1,52 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import threading
+import time
+
+
+class CircuitBreaker(object):
+    """ Transport failures of a single host, the transport is not used for a while after consecutive failures """
+
+    FAILURES = 2
+    RESET_TIMEOUT = 30
+
+    def __init__(self, failures=FAILURES, reset_timeout=RESET_TIMEOUT):
+        """
+        :param failures: consecutive failures which open the circuit
+        :param reset_timeout: seconds after which open circuit lets a trial connection through
+        """
+
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_time = 0
+        self.failures = failures
+        self.reset_timeout = reset_timeout
+
+    @property
+    def retry_after(self):
+        """ Seconds until the transport is tried again, 0 if the circuit is closed """
+
+        if self._failures < self.failures:
+            return 0
+        return max(self._opened_time + self.reset_timeout - time.time(), 0)
+
+    def allow(self):
+        """ Transport may be used, closed circuit or reset timeout of open circuit expired
+        :rtype: bool
+        """
+
+        return not self.retry_after
+
+    def record(self, success):
+        """ Report transport result, a failure after reset timeout opens the circuit again
+        :param success: host responded
+        """
+
+        with self._lock:
+            if success:
+                self._failures = 0
+            else:
+                self._failures += 1
+                if self._failures >= self.failures:
+                    self._opened_time = time.time()
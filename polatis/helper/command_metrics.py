@@ -0,0 +1,161 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+
+
+class CommandMetrics(object):
+    """ In-process TL1 command statistics grouped by driver command and TL1 verb """
+
+    # histogram upper bounds, seconds
+    BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+    NO_COMMAND = "-"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._stats = {}
+        self._dump_thread = None
+
+    @property
+    def driver_command(self):
+        """ Driver command running in the current thread """
+
+        return getattr(self._local, "driver_command", self.NO_COMMAND)
+
+    @contextmanager
+    def command_context(self, driver_command):
+        """ Attribute TL1 commands sent by the current thread to the driver command
+        :param driver_command: driver command name
+        """
+
+        previous = self.driver_command
+        self._local.driver_command = driver_command
+        try:
+            yield
+        finally:
+            self._local.driver_command = previous
+
+    def _verb_stats(self, verb):
+        command_stats = self._stats.setdefault(self.driver_command, {})
+        if verb not in command_stats:
+            command_stats[verb] = {"count": 0, "retries": 0, "bytes_sent": 0, "bytes_received": 0,
+                                   "time_total": 0.0, "time_max": 0.0, "status": {},
+                                   "histogram": [0] * (len(self.BUCKETS) + 1)}
+        return command_stats[verb]
+
+    def record(self, verb, duration, status, bytes_sent=0, bytes_received=0):
+        """ Record completed TL1 command
+        :param verb: TL1 verb, ENT-PATCH
+        :param duration: wall time in seconds
+        :param status: completion code, COMPLD/DENY, ERROR if response was not received
+        :param bytes_sent:
+        :param bytes_received:
+        """
+
+        with self._lock:
+            stats = self._verb_stats(verb)
+            stats["count"] += 1
+            stats["bytes_sent"] += bytes_sent
+            stats["bytes_received"] += bytes_received
+            stats["time_total"] += duration
+            stats["time_max"] = max(stats["time_max"], duration)
+            stats["status"][status] = stats["status"].get(status, 0) + 1
+            stats["histogram"][bisect_left(self.BUCKETS, duration)] += 1
+
+    def record_retry(self, verb):
+        """ Record repeated TL1 command, reconnect is counted as ACT-USER retry """
+
+        with self._lock:
+            self._verb_stats(verb)["retries"] += 1
+
+    def snapshot(self):
+        """ Copy of collected statistics
+        :return: {driver_command: {verb: stats}}
+        :rtype: dict
+        """
+
+        with self._lock:
+            return json.loads(json.dumps(self._stats))
+
+    def reset(self):
+        with self._lock:
+            self._stats = {}
+
+    def dump(self, path):
+        """ Write statistics as json, histogram buckets are labeled by upper bound
+        :param path: metrics file path
+        """
+
+        stats = self.snapshot()
+        labels = ["le_{}".format(bound) for bound in self.BUCKETS] + ["le_inf"]
+        for command_stats in stats.values():
+            for verb_stats in command_stats.values():
+                verb_stats["histogram"] = dict(zip(labels, verb_stats["histogram"]))
+
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as metrics_file:
+            json.dump({"time": time.strftime("%Y-%m-%d %H:%M:%S"), "commands": stats}, metrics_file,
+                      indent=2, sort_keys=True)
+        if os.path.exists(path):
+            os.remove(path)
+        os.rename(tmp_path, path)
+
+    def start_dump(self, path, interval, logger):
+        """ Dump statistics periodically in a background thread, only one thread is started
+        :param path: metrics file path
+        :param interval: seconds between dumps
+        :param logger:
+        """
+
+        with self._lock:
+            if not interval or self._dump_thread:
+                return
+            self._dump_thread = threading.Thread(target=self._dump_loop, args=(path, interval, logger),
+                                                 name="PolatisMetrics")
+            self._dump_thread.daemon = True
+            self._dump_thread.start()
+
+    def _dump_loop(self, path, interval, logger):
+        while True:
+            time.sleep(interval)
+            try:
+                self.dump(path)
+            except (IOError, OSError) as e:
+                logger.warn("Unable to save metrics {}: {}".format(path, e))
+
+
+METRICS = CommandMetrics()
+
+
+def tl1_verb(command):
+    """ Verb of TL1 command, 'ENT-PATCH:"SW":1,17:5:;' -> 'ENT-PATCH' """
+
+    return command.strip().split(":", 1)[0].upper()
+
+
+def measured_command(function):
+    """ Driver command decorator, TL1 commands sent during the call are attributed to it in metrics and trace,
+    trace is flushed to the driver log if the command fails
+    """
+
+    @wraps(function)
+    def wrapper(driver, *args, **kwargs):
+        with METRICS.command_context(function.__name__):
+            try:
+                return function(driver, *args, **kwargs)
+            except Exception:
+                # trace buffer attributes its events to driver commands, so it is imported on failure only
+                from polatis.helper.trace_buffer import TRACE
+                TRACE.flush(driver._logger, reason="{} failed".format(function.__name__))
+                raise
+
+    return wrapper
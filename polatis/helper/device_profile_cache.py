@@ -0,0 +1,81 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import threading
+
+
+class DeviceProfileCache(object):
+    """ On-disk cache of device profiles keyed by host """
+
+    def __init__(self, path, logger):
+        """
+        :param path: cache file path, cache is disabled if empty
+        :type path: str
+        :param logger:
+        :type logger: Logger
+        """
+
+        self._path = path
+        self._logger = logger
+        self._lock = threading.Lock()
+        self._profiles = None
+
+    def _load(self):
+        if self._profiles is None:
+            self._profiles = {}
+            if self._path and os.path.isfile(self._path):
+                try:
+                    with open(self._path) as cache_file:
+                        self._profiles = json.load(cache_file)
+                except (IOError, ValueError) as e:
+                    self._logger.warn("Unable to read device profiles {}: {}".format(self._path, e))
+        return self._profiles
+
+    def _save(self):
+        if not self._path:
+            return
+        tmp_path = self._path + ".tmp"
+        try:
+            if not os.path.isdir(os.path.dirname(self._path)):
+                os.makedirs(os.path.dirname(self._path))
+            with open(tmp_path, "w") as cache_file:
+                json.dump(self._profiles, cache_file, indent=2, sort_keys=True)
+            if os.path.exists(self._path):
+                os.remove(self._path)
+            os.rename(tmp_path, self._path)
+        except (IOError, OSError) as e:
+            self._logger.warn("Unable to save device profiles {}: {}".format(self._path, e))
+
+    def get(self, host):
+        """ Device profile
+        :param host: device address
+        :return: profile, empty if host is not known
+        :rtype: dict
+        """
+
+        with self._lock:
+            return dict(self._load().get(host, {}))
+
+    def update(self, host, **profile):
+        """ Update device profile, cache is saved only if profile was changed
+        :param host: device address
+        :param profile: profile values, serial, size, switch_name, model, version, transport
+        """
+
+        with self._lock:
+            current = self._load().setdefault(host, {})
+            changed = dict((key, value) for key, value in profile.items() if current.get(key) != value)
+            if changed:
+                current.update(changed)
+                self._save()
+
+    def remove(self, host):
+        """ Remove device profile
+        :param host: device address
+        """
+
+        with self._lock:
+            if self._load().pop(host, None) is not None:
+                self._save()
@@ -0,0 +1,160 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import threading
+from contextlib import contextmanager
+from functools import wraps
+
+from cloudshell.layer_one.core.layer_one_driver_exception import LayerOneDriverException
+
+
+class DeviceContext(object):
+    """ State of a single switch served by the driver """
+
+    def __init__(self, address, cli_handler):
+        """
+        :param address: switch address, '192.168.42.240'
+        :param cli_handler: cli handler connected to the switch
+        """
+
+        self.address = address
+        self.cli_handler = cli_handler
+        # commands to the same switch are serialized
+        self.lock = threading.RLock()
+        self.total_ports_count = None
+        self.logical_ports_count = None
+        self.port_index = None
+        self.serial_number = None
+        self.state_id = None
+        self.state_token = None
+        self.optical_snapshot = None
+        self.optical_snapshot_time = 0
+        self.optical_snapshot_lock = threading.Lock()
+        self.patch_table = None
+        self.patch_table_time = 0
+        # patch table changes made by the driver
+        self.patch_changes = 0
+        self.patch_monitor = None
+
+
+class DeviceRegistry(object):
+    """ Switches served by the driver keyed by address, the switch logged in by the current connection thread
+    is used by default for commands without address, the last logged in switch if the thread did not log in
+    """
+
+    def __init__(self, cli_handler_factory):
+        """
+        :param cli_handler_factory: callable creating cli handler for a new switch
+        """
+
+        self._cli_handler_factory = cli_handler_factory
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._devices = {}
+        self.default = DeviceContext(None, cli_handler_factory())
+
+    @staticmethod
+    def host(address):
+        """ Switch address of resource or port address, '192.168.42.240/1/21' -> '192.168.42.240' """
+
+        if isinstance(address, (list, tuple)):
+            return DeviceRegistry.host(address[0]) if address else None
+        return address.split("/")[0] if address else None
+
+    def register(self, address):
+        """ Switch context for login, created if the switch is not known yet
+        :param address: switch address
+        :rtype: DeviceContext
+        """
+
+        host = self.host(address)
+        with self._lock:
+            device = self._devices.get(host)
+            if not device:
+                if self.default.address is None:
+                    device = self.default
+                    device.address = host
+                else:
+                    device = DeviceContext(host, self._cli_handler_factory())
+                self._devices[host] = device
+            self.default = device
+        self._local.logged_in = device
+        return device
+
+    def get(self, address):
+        """ Switch context for resource or port address, the default one if address is not defined
+        or if the switch is not known and at most one switch is logged in
+        :rtype: DeviceContext
+        :raises LayerOneDriverException: if the switch is not known and several switches are logged in
+        """
+
+        host = self.host(address)
+        with self._lock:
+            device = self._devices.get(host)
+            if device:
+                return device
+            if host is None or len(self._devices) <= 1:
+                return self.logged_in
+        raise LayerOneDriverException(self.__class__.__name__, "Switch {} is not logged in".format(host))
+
+    @property
+    def logged_in(self):
+        """ Switch context logged in by the current thread, the last logged in one if the thread did not log in """
+
+        return getattr(self._local, "logged_in", None) or self.default
+
+    @property
+    def current(self):
+        """ Switch context selected in the current thread """
+
+        return getattr(self._local, "device", None) or self.logged_in
+
+    @contextmanager
+    def activate(self, device, exclusive=True):
+        """ Select switch context for the current thread
+        :type device: DeviceContext
+        :param exclusive: wait for other commands to the same switch, False for worker threads of a running command
+        """
+
+        previous = getattr(self._local, "device", None)
+        if exclusive:
+            device.lock.acquire()
+        self._local.device = device
+        try:
+            yield device
+        finally:
+            self._local.device = previous
+            if exclusive:
+                device.lock.release()
+
+
+class DeviceAttribute(object):
+    """ Attribute of the switch context selected in the current thread """
+
+    def __init__(self, name):
+        self._name = name
+
+    def __get__(self, driver, owner):
+        if driver is None:
+            return self
+        return getattr(driver._devices.current, self._name)
+
+    def __set__(self, driver, value):
+        setattr(driver._devices.current, self._name, value)
+
+
+def device_command(addressed=True):
+    """ Run driver command on the switch selected by address prefix of its first argument
+    :param addressed: False if command has no address argument, the default switch is used
+    """
+
+    def decorator(function):
+        @wraps(function)
+        def wrapper(driver, *args, **kwargs):
+            device = driver._devices.get(args[0] if addressed and args else None)
+            with driver._devices.activate(device):
+                return function(driver, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,109 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from array import array
+
+
+class PortIndex(object):
+    """ Translation between CloudShell port addresses and switch ports of a single device size and port mode,
+    in logical mode port N is ingress port N and egress port N + logical ports count,
+    in physical mode port N is switch port N
+    """
+
+    __slots__ = ("total_ports_count", "logical_ports_count", "is_logical", "ports_count", "_ingress", "_egress",
+                 "_ports")
+
+    def __init__(self, total_ports_count, logical_ports_count, is_logical=False):
+        """
+        :param total_ports_count: switch ports count
+        :param logical_ports_count: ingress ports count of logical mode
+        :param is_logical: logical port mode
+        """
+
+        count = logical_ports_count
+        self.total_ports_count = total_ports_count
+        self.logical_ports_count = count
+        self.is_logical = is_logical
+        self.ports_count = count if is_logical else total_ports_count
+
+        # switch ports of port number, switch port to port number, 0 for switch ports without port
+        if is_logical:
+            self._ingress = array("i", xrange(count + 1))
+            self._egress = array("i", [0]) + array("i", xrange(count + 1, 2 * count + 1))
+            self._ports = (array("i", xrange(count + 1)) + array("i", xrange(1, count + 1)) +
+                           array("i", [0]) * (total_ports_count - 2 * count))
+        else:
+            self._ingress = self._egress = self._ports = array("i", xrange(total_ports_count + 1))
+
+    def port(self, address):
+        """ Port number of CloudShell port address, '192.168.42.240/1/21' -> 21
+        :raises IndexError: if the port does not exist in the current port mode
+        """
+
+        port = int(address[address.rfind("/") + 1:])
+        if not 0 < port <= self.ports_count:
+            raise IndexError("Port {} is out of range".format(address))
+        return port
+
+    def ingress(self, address):
+        """ Ingress switch port of CloudShell port address """
+
+        return self._ingress[self.port(address)]
+
+    def egress(self, address):
+        """ Egress switch port of CloudShell port address """
+
+        return self._egress[self.port(address)]
+
+    def ingress_egress(self, port):
+        """ Ingress and egress switch ports of port number, the same switch port in physical mode
+        :rtype: tuple
+        """
+
+        return self._ingress[port], self._egress[port]
+
+    def switch_port(self, port):
+        """ Port number of switch port, 0 if the switch port has no CloudShell port in the current port mode """
+
+        return self._ports[port] if 0 < port <= self.total_ports_count else 0
+
+    def is_ingress(self, port):
+        """ Switch port is on the ingress side of the switch, it reports tx power """
+
+        return port <= self.logical_ports_count
+
+    def uni_patch(self, src_address, dst_address):
+        """ Patch of unidirectional connection, available in logical port mode only
+        :return: (ingress, egress) tuple
+        """
+
+        if not self.is_logical:
+            raise Exception("Unidirectional connection is not available in physical port mode")
+        return self.ingress(dst_address), self.egress(src_address)
+
+    def bidi_patches(self, src_address, dst_address):
+        """ Patches of bidirectional connection, lower port number is the ingress one in physical port mode
+        :return: list of (ingress, egress) tuples
+        """
+
+        if self.is_logical:
+            return [self.uni_patch(src_address, dst_address), self.uni_patch(dst_address, src_address)]
+        src, dst = self.port(src_address), self.port(dst_address)
+        return [(min(src, dst), max(src, dst))]
+
+    def clear_to_port(self, src_address, dst_address):
+        """ Switch port to clear connection from source port to destination port """
+
+        if self.is_logical:
+            return self.ingress(dst_address)
+        return min(self.port(src_address), self.port(dst_address))
+
+    def clear_ports(self, address):
+        """ Switch ports to clear all connections of the port
+        :rtype: list
+        """
+
+        if self.is_logical:
+            port = self.port(address)
+            return [self._ingress[port], self._egress[port]]
+        return [self.port(address)]
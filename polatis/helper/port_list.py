@@ -0,0 +1,122 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+
+def encode_port_list(ports):
+    """ Build TL1 port list, consecutive ports are collapsed into '&&' ranges
+    :param ports: port numbers, [1, 2, 3, 4, 7, 9, 10]
+    :type ports: collections.Iterable
+    :return: TL1 port list, '1&&4&7&9&10'
+    :rtype: str
+    """
+
+    items = []
+    for start, end in port_ranges(ports):
+        if end - start > 1:
+            items.append("{}&&{}".format(start, end))
+        else:
+            items.extend(str(port) for port in range(start, end + 1))
+    return "&".join(items)
+
+
+def encode_port_pairs(pairs):
+    """ Build TL1 port lists of patches, runs of consecutive pairs are collapsed into '&&' ranges
+    :param pairs: (ingress, egress) tuples, [(1, 17), (2, 18), (3, 19), (5, 30)]
+    :type pairs: collections.Iterable
+    :return: ingress and egress port lists, ('1&&3&5', '17&&19&30')
+    :rtype: tuple
+    """
+
+    runs = []
+    for ingress, egress in sorted(pairs):
+        if runs and runs[-1][1] == ingress - 1 and runs[-1][3] == egress - 1:
+            runs[-1][1] = ingress
+            runs[-1][3] = egress
+        else:
+            runs.append([ingress, ingress, egress, egress])
+
+    ingress_items = []
+    egress_items = []
+    for ingress_start, ingress_end, egress_start, egress_end in runs:
+        if ingress_end - ingress_start > 1:
+            ingress_items.append("{}&&{}".format(ingress_start, ingress_end))
+            egress_items.append("{}&&{}".format(egress_start, egress_end))
+        else:
+            ingress_items.extend(str(port) for port in range(ingress_start, ingress_end + 1))
+            egress_items.extend(str(port) for port in range(egress_start, egress_end + 1))
+    return "&".join(ingress_items), "&".join(egress_items)
+
+
+def encode_port_range(start, end):
+    """ Build TL1 port list of a port range
+    :return: TL1 port list, '1&&16' or '5' for a single port
+    :rtype: str
+    """
+
+    return "{}&&{}".format(start, end) if end > start else str(start)
+
+
+def split_port_range(start, end, chunk_size=0):
+    """ Split port range into chunks
+    :param start: first port
+    :param end: last port, inclusive
+    :param chunk_size: ports per chunk, the whole range is a single chunk if 0
+    :return: list of (start, end) tuples, both inclusive
+    :rtype: list
+    """
+
+    if not chunk_size:
+        return [(start, end)]
+    return [(chunk_start, min(chunk_start + chunk_size - 1, end)) for chunk_start in range(start, end + 1, chunk_size)]
+
+
+def port_ranges(ports):
+    """ Split ports into sorted runs of consecutive numbers
+    :param ports: port numbers
+    :type ports: collections.Iterable
+    :return: list of (start, end) tuples, both inclusive
+    :rtype: list
+    """
+
+    ranges = []
+    for port in sorted(set(int(port) for port in ports)):
+        if ranges and ranges[-1][1] == port - 1:
+            ranges[-1][1] = port
+        else:
+            ranges.append([port, port])
+    return [tuple(port_range) for port_range in ranges]
+
+
+def decode_port_list(port_list):
+    """ Expand TL1 port list
+    :param port_list: TL1 port list, '1&&4&7'
+    :type port_list: str
+    :return: port numbers, [1, 2, 3, 4, 7]
+    :rtype: list
+    """
+
+    ports = []
+    for item in port_list.replace("&&", "-").split("&"):
+        if not item:
+            continue
+        start, _, end = item.partition("-")
+        ports.extend(range(int(start), int(end or start) + 1))
+    return ports
+
+
+def count_port_list(port_list):
+    """ Ports count of TL1 port list without expanding it
+    :param port_list: TL1 port list, '1&&4&7'
+    :type port_list: str
+    :return: ports count, 5, 0 if port list is empty or not numeric
+    :rtype: int
+    """
+
+    count = 0
+    for item in port_list.replace("&&", "-").split("&"):
+        start, _, end = item.partition("-")
+        end = end or start
+        if not start.isdigit() or not end.isdigit():
+            return 0
+        count += int(end) - int(start) + 1
+    return count
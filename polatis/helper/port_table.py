@@ -0,0 +1,90 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from array import array
+
+NO_VALUE = float("nan")
+
+
+def _value(value):
+    return None if value != value else value
+
+
+class PortTable(object):
+    """ Array backed ports information indexed by port number """
+
+    __slots__ = ("ports_count", "connections", "power", "wavelength")
+
+    def __init__(self, ports_count):
+        """
+        :param ports_count: total ports count
+        :type ports_count: int
+        """
+
+        size = ports_count + 1
+        self.ports_count = ports_count
+        self.connections = array("i", [0]) * size
+        self.power = array("d", [NO_VALUE]) * size
+        self.wavelength = array("d", [NO_VALUE]) * size
+
+    def update_connections(self, connections):
+        """ Add patches to the table
+        :param connections: iterable of (src, dst) port pairs
+        """
+
+        table = self.connections
+        for src, dst in connections:
+            if 0 < src <= self.ports_count and 0 < dst <= self.ports_count:
+                table[src] = dst
+                table[dst] = src
+
+    def update_power(self, records):
+        """ :param records: iterable of (port, power) records """
+
+        self._update(self.power, records)
+
+    def update_wavelength(self, records):
+        """ :param records: iterable of (port, wavelength) records """
+
+        self._update(self.wavelength, records)
+
+    def copy_optical(self, port_table):
+        """ Take ports power and wavelength of a table of the same size
+        :type port_table: PortTable
+        """
+
+        self.power = array("d", port_table.power)
+        self.wavelength = array("d", port_table.wavelength)
+
+    def _update(self, column, records):
+        for port, value in records:
+            if 0 < port <= self.ports_count:
+                column[port] = value
+
+    def get_port(self, port, port_index):
+        """ Single port record in the port mode of the port index, see iter_ports
+        :type port_index: polatis.helper.port_index.PortIndex
+        :return: (port, mapped_port, wavelength, tx_power, rx_power)
+        :rtype: tuple
+        """
+
+        if not 0 < port <= port_index.ports_count:
+            raise IndexError("Port {} is out of range".format(port))
+        return self._port_record(port, port_index)
+
+    def iter_ports(self, port_index):
+        """ View of the table in the port mode of the port index, in logical mode port N represents
+        ingress port N and egress port N + logical ports count
+        :type port_index: polatis.helper.port_index.PortIndex
+        :return: iterator of (port, mapped_port, wavelength, tx_power, rx_power) records,
+            mapped_port is 0 for not connected ports, not defined values are None
+        """
+
+        for port in xrange(1, port_index.ports_count + 1):
+            yield self._port_record(port, port_index)
+
+    def _port_record(self, port, port_index):
+        ingress, egress = port_index.ingress_egress(port)
+        return (port, port_index.switch_port(self.connections[egress]), _value(self.wavelength[ingress]),
+                _value(self.power[ingress]) if port_index.is_ingress(ingress) else None,
+                None if port_index.is_ingress(egress) else _value(self.power[egress]))
@@ -0,0 +1,107 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from xml.etree import ElementTree
+from xml.etree.ElementTree import Element, SubElement
+
+from cloudshell.layer_one.core.response.resource_info.resource_info_builder import ResourceInfoBuilder
+from cloudshell.layer_one.core.response.response_info import ResourceDescriptionResponseInfo
+
+
+class StreamingResourceDescriptionResponseInfo(ResourceDescriptionResponseInfo):
+    """ Resource description of a single chassis, ports are created while the response is serialized
+    and only a batch of port nodes is kept in memory at a time
+    """
+
+    CHILD_RESOURCES = "ChildResources"
+    # port nodes serialized at once
+    BATCH_SIZE = 64
+
+    def __init__(self, chassis, ports):
+        """
+        :param chassis: chassis without ports
+        :type chassis: cloudshell.layer_one.core.response.resource_info.entities.chassis.Chassis
+        :param ports: callable returning iterator of (port, mapped port id) tuples, mapped port id is None
+            for not mapped ports, ports are not attached to the chassis
+        """
+
+        super(StreamingResourceDescriptionResponseInfo, self).__init__([chassis])
+        self._chassis = chassis
+        self._ports = ports
+
+    @staticmethod
+    def _build_port_node(port, address, mapping_address=None):
+        """ Port node as ResourceInfoBuilder builds it from its templates, templates are not parsed for each port
+        :type port: cloudshell.layer_one.core.response.resource_info.entities.port.Port
+        :param address: port address
+        :param mapping_address: address of the mapped port
+        :rtype: xml.etree.ElementTree.Element
+        """
+
+        node = Element("ResourceInfo", Name=port.name, ResourceFamilyName=port.family_name,
+                       ResourceModelName=port.model_name, SerialNumber=port.serial_number, Address=address)
+        node.text = "\n    "
+        SubElement(node, "ChildResources").tail = "\n    "
+        attributes_node = SubElement(node, "ResourceAttributes")
+        attributes_node.tail = "\n"
+        for attribute in port.attributes:
+            SubElement(attributes_node, "Attribute", Name=attribute.name, Type=attribute.type, Value=attribute.value)
+        if mapping_address:
+            mapping_node = SubElement(node, "ResourceMapping")
+            mapping_node.text = "\n    "
+            incoming_node = SubElement(mapping_node, "IncomingMapping")
+            incoming_node.text = mapping_address
+            incoming_node.tail = "\n"
+        return node
+
+    def _iter_port_nodes(self):
+        address = self._chassis.address
+        for port, mapped_port_id in self._ports():
+            yield self._build_port_node(port, "{}/{}".format(address, port.resource_id),
+                                        None if mapped_port_id is None else "{}/{}".format(address, mapped_port_id))
+
+    def _build_nodes(self):
+        """ Response info node with chassis node without ports
+        :return: response info node and child resources node of the chassis
+        :rtype: tuple
+        """
+
+        response_info_node = self._build_response_info_node()
+        response_info_node.attrib["xmlns:xsi"] = "http://www.w3.org/2001/XMLSchema-instance"
+        response_info_node.attrib["xsi:type"] = "ResourceInfoResponse"
+        chassis_node = ResourceInfoBuilder._build_resource_node(self._chassis)
+        response_info_node.append(chassis_node)
+        return response_info_node, chassis_node.find("ChildResources")
+
+    def build_xml_node(self):
+        response_info_node, child_resources_node = self._build_nodes()
+        child_resources_node.extend(self._iter_port_nodes())
+        return response_info_node
+
+    def iter_xml(self):
+        """ Serialized response info node, port nodes are serialized in batches of BATCH_SIZE
+        :return: iterator of UTF-8 encoded XML chunks
+        """
+
+        response_info_node, _ = self._build_nodes()
+        head, tail = ElementTree.tostring(response_info_node, encoding="utf-8").split(
+            "<{} />".format(self.CHILD_RESOURCES), 1)
+        yield head + "<{}>".format(self.CHILD_RESOURCES)
+
+        batch = Element(self.CHILD_RESOURCES)
+        for node in self._iter_port_nodes():
+            batch.append(node)
+            if len(batch) == self.BATCH_SIZE:
+                yield self._serialize_children(batch)
+                batch = Element(self.CHILD_RESOURCES)
+        if len(batch):
+            yield self._serialize_children(batch)
+
+        yield "</{}>".format(self.CHILD_RESOURCES) + tail
+
+    @staticmethod
+    def _serialize_children(node):
+        """ Serialized child nodes without the enclosing tags """
+
+        output = ElementTree.tostring(node, encoding="utf-8")
+        return output[len(node.tag) + 2:-len(node.tag) - 3]
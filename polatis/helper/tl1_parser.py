@@ -0,0 +1,84 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import re
+from itertools import chain
+
+
+def to_number(value):
+    """ Convert TL1 value to float, None if value is not numeric """
+
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+class PortValuesParser(object):
+    """ Incremental parser of '"<port>:<value>..."' TL1 response records """
+
+    POWER_PATTERN = re.compile(r'"(\d+):([^",\s]+)"')
+    WAVELENGTH_PATTERN = re.compile(r'"(\d+):([^",\s]+),')
+    STATUS_PATTERN = re.compile(r'"(\d+):(\S+)"')
+
+    def __init__(self, pattern, converter=to_number):
+        """
+        :param pattern: compiled pattern with port and value groups
+        :param converter: value converter, records converted to None are skipped
+        """
+
+        self._pattern = pattern
+        self._converter = converter
+        self._tail = ''
+
+    def feed(self, chunk):
+        """ Consume response chunk, only complete lines are parsed
+        :param chunk: next part of the response
+        :type chunk: str
+        :return: iterator of (port, value) records
+        """
+
+        data = self._tail + chunk
+        end = data.rfind('\n') + 1
+        self._tail = data[end:]
+        return self._records(data, end)
+
+    def close(self):
+        """ Parse the rest of the response
+        :return: iterator of (port, value) records
+        """
+
+        data, self._tail = self._tail, ''
+        return self._records(data, len(data))
+
+    def parse(self, output):
+        """ Parse complete response
+        :return: iterator of (port, value) records
+        """
+
+        return chain(self.feed(output), self.close())
+
+    def _records(self, data, end):
+        for match in self._pattern.finditer(data, 0, end):
+            value = self._converter(match.group(2))
+            if value is not None:
+                yield int(match.group(1)), value
+
+
+class PortValuesConsumer(object):
+    """ Pipeline response consumer passing parsed port records to the update callable """
+
+    def __init__(self, parser, update):
+        """
+        :type parser: PortValuesParser
+        :param update: callable taking iterable of (port, value) records
+        """
+
+        self._parser = parser
+        self._update = update
+
+    def feed(self, data):
+        self._update(self._parser.feed(data))
+
+    def close(self):
+        self._update(self._parser.close())
@@ -0,0 +1,75 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import threading
+import time
+from collections import deque
+
+from polatis.helper.command_metrics import METRICS
+
+
+class TraceBuffer(object):
+    """ Ring buffer of compact TL1 command events, formatted only when flushed """
+
+    SIZE = 1000
+    MAX_PORTS_LENGTH = 48
+
+    def __init__(self, size=SIZE):
+        """
+        :param size: events kept in memory, tracing is disabled if 0
+        :type size: int
+        """
+
+        self._lock = threading.Lock()
+        self._events = deque(maxlen=size)
+        self.size = size
+
+    def resize(self, size):
+        """ Change buffer size, the latest events are kept """
+
+        with self._lock:
+            if size != self.size:
+                self._events = deque(self._events, maxlen=size)
+                self.size = size
+
+    def event(self, command, ports, duration, status):
+        """ Record event
+        :param command: TL1 verb or driver operation, ENT-PATCH
+        :param ports: TL1 port list, '1&&16'
+        :param duration: seconds
+        :param status: COMPLD/DENY/ERROR
+        """
+
+        if self.size:
+            self._events.append((time.time(), METRICS.driver_command, command, ports, duration, status))
+
+    def flush(self, logger, reason="on demand"):
+        """ Write buffered events to the log and clear the buffer
+        :param logger:
+        :param reason: flush reason written to the log
+        :return: flushed events count
+        :rtype: int
+        """
+
+        with self._lock:
+            events, self._events = self._events, deque(maxlen=self.size)
+
+        if events:
+            logger.info("Trace of {} TL1 commands, {}:".format(len(events), reason))
+        for event_time, driver_command, command, ports, duration, status in events:
+            if len(ports) > self.MAX_PORTS_LENGTH:
+                ports = ports[:self.MAX_PORTS_LENGTH] + "..."
+            logger.info("{}.{:03d} {} {} {} {:.3f}s {}".format(
+                time.strftime("%H:%M:%S", time.localtime(event_time)), int(event_time * 1000) % 1000,
+                driver_command, command, ports, duration, status))
+        return len(events)
+
+
+TRACE = TraceBuffer()
+
+
+def tl1_ports(command):
+    """ Port list of TL1 command, 'ENT-PATCH:"SW":1&&4,17&&20:5:;' -> '1&&4,17&&20' """
+
+    fields = command.split(":", 3)
+    return fields[2] if len(fields) > 3 else ""
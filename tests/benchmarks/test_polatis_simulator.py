@@ -0,0 +1,36 @@
+from unittest import TestCase
+
+from mock import Mock
+
+from benchmarks.polatis_simulator import PolatisSimulator
+
+
+class TestPolatisSimulator(TestCase):
+    def setUp(self):
+        self._instance = PolatisSimulator(4)
+
+    def tearDown(self):
+        self._instance.server_close()
+
+    def test_patch_commands(self):
+        self.assertIn('M  1 COMPLD', self._instance.execute('ENT-PATCH:"SIMULATOR":1&&2,5&6:1:'))
+        self.assertIn('"1,5"\r\n   "2,6"', self._instance.execute('RTRV-PATCH:"SIMULATOR"::2:'))
+        self._instance.execute('DLT-PATCH:"SIMULATOR":6:3:')
+        self.assertEqual(self._instance.patch, {1: 5})
+
+    def test_port_values(self):
+        output = self._instance.execute('RTRV-PORT-POWER:"SIMULATOR":1&&8:1:')
+        self.assertEqual(output.count('"'), 16)
+        self.assertIn('M  2 DENY', self._instance.execute('RTRV-PORT-PMON:"SIMULATOR":9:2:'))
+
+    def test_inflation(self):
+        self._instance.inflation = 10
+        self.assertIn('"SYSTEM:SIZE=4x4"\r\n   /* ********** */', self._instance.execute('RTRV-EQPT:"SIMULATOR":SYSTEM:1:'))
+
+    def test_report(self):
+        subscriber = Mock()
+        self._instance.subscribers.add(subscriber)
+
+        self._instance.report('REPT EVT PATCH')
+
+        self.assertIn('A  1 REPT EVT PATCH', subscriber.send.call_args[0][0])
@@ -0,0 +1,64 @@
+from unittest import TestCase
+
+from mock import Mock
+
+from cloudshell.layer_one.core.layer_one_driver_exception import LayerOneDriverException
+from polatis.cli.l1_cli_handler import L1CliHandler
+from polatis.cli.tl1_session_polatis import TL1Session_Polatis
+
+
+class TestL1CliHandler(TestCase):
+    def setUp(self):
+        self._logger = Mock()
+        self._instance = L1CliHandler(self._logger)
+        self._instance._session_types = ['TL1', 'SSH', 'TELNET']
+        self._instance._ports = {'TL1': 3082, 'SSH': 22, 'TELNET': 23}
+        self._instance._connect_timeouts = {'TL1': 5}
+        self._instance._keepalive_interval = 0
+        self._instance.define_session_attributes('192.168.42.240', 'user', 'password')
+
+    def tearDown(self):
+        L1CliHandler.TRANSPORT_CACHE.clear()
+        L1CliHandler.CIRCUIT_BREAKERS.clear()
+        L1CliHandler.COMMAND_TIMEOUTS.clear()
+
+    def test_new_sessions_configured_order(self):
+        sessions = self._instance._new_sessions()
+        self.assertEqual([session.session_type for session in sessions], ['TL1', 'SSH', 'TELNET'])
+        self.assertEqual([session.connect_timeout for session in sessions], [5, None, None])
+
+    def test_new_sessions_cached_transport_first(self):
+        session = Mock(host='192.168.42.240', session_type='TELNET')
+        self._instance._new_sessions()[0].on_session_start(session, self._logger)
+
+        sessions = self._instance._new_sessions()
+        self.assertEqual([session.session_type for session in sessions], ['TELNET', 'TL1', 'SSH'])
+
+    def test_new_sessions_configured_type_only(self):
+        self._instance._session_types = ['TL1']
+
+        sessions = self._instance._new_sessions()
+        self.assertEqual(len(sessions), 1)
+        self.assertIsInstance(sessions[0], TL1Session_Polatis)
+        self.assertEqual(sessions[0].port, 3082)
+
+    def test_new_sessions_unknown_type(self):
+        self._instance._session_types = ['HTTP']
+
+        self.assertRaises(LayerOneDriverException, self._instance._new_sessions)
+
+    def test_new_sessions_skip_open_circuit(self):
+        for _ in range(2):
+            self._instance._circuit_breaker('TL1').record(False)
+
+        sessions = self._instance._new_sessions()
+        self.assertEqual([session.session_type for session in sessions], ['SSH', 'TELNET'])
+        self.assertIs(sessions[0].circuit_breaker, self._instance._circuit_breaker('SSH'))
+        self.assertIs(sessions[0].command_timeouts, self._instance._command_timeouts())
+
+    def test_new_sessions_all_circuits_open(self):
+        for session_type in ['TL1', 'SSH', 'TELNET']:
+            for _ in range(2):
+                self._instance._circuit_breaker(session_type).record(False)
+
+        self.assertRaises(LayerOneDriverException, self._instance._new_sessions)
@@ -0,0 +1,63 @@
+from unittest import TestCase
+
+from mock import Mock
+
+from polatis.cli.patch_monitor import PatchMonitor
+
+
+class TestPatchMonitor(TestCase):
+    def setUp(self):
+        self._logger = Mock()
+        self._session = Mock()
+        self._instance = PatchMonitor(lambda: self._session, self._logger)
+
+    def test_not_synchronized(self):
+        self.assertIsNone(self._instance.connections)
+
+    def test_resync(self):
+        self._session.tl1_expect.return_value = 'M  1 COMPLD\n   "1,17"\n   "2,18"\n;'
+
+        self._instance._resync(self._session)
+
+        self.assertEqual(self._instance.connections, {1: 17, 17: 1, 2: 18, 18: 2})
+
+    def test_resync_repeated_if_patch_changed_meanwhile(self):
+        def tl1_expect(command, logger):
+            if self._session.tl1_expect.call_count == 1:
+                self._instance._on_message('REPT EVT PATCH', '')
+                return 'M  1 COMPLD\n   "1,17"\n;'
+            return 'M  2 COMPLD\n;'
+
+        self._session.tl1_expect.side_effect = tl1_expect
+
+        self._instance._resync(self._session)
+
+        self.assertEqual(self._instance.connections, {})
+        self.assertEqual(self._session.tl1_expect.call_count, 2)
+
+    def test_invalidate(self):
+        self._session.tl1_expect.return_value = 'M  1 COMPLD\n   "1,17"\n;'
+        self._instance._resync(self._session)
+
+        self._instance.invalidate()
+
+        self.assertIsNone(self._instance.connections)
+
+    def test_alarms_ignored(self):
+        self._instance._on_message('REPT ALM EQPT', '')
+        self.assertFalse(self._instance._changed)
+
+    def test_database_change_marks_mirror_changed(self):
+        self._instance._on_message('REPT DBCHG', '\r\n   SW 17-01-01 00:00:00\r\nA  12 REPT DBCHG\r\n'
+                                                 '   "ENT-PATCH:1,17:USER=admin"\r\n;')
+        self.assertTrue(self._instance._changed)
+
+    def test_stopped_if_messages_not_allowed(self):
+        self._session.tl1_expect.side_effect = Exception('Error: Status "DENY"')
+        self._instance._running = True
+
+        self._instance._monitor()
+
+        self.assertFalse(self._instance.running)
+        self.assertIsNone(self._instance.connections)
+        self.assertEqual(self._session.tl1_expect.call_count, 1)
@@ -0,0 +1,52 @@
+import threading
+from unittest import TestCase
+
+from mock import Mock
+
+from polatis.cli.polatis_session_pool_manager import PolatisSessionPoolManager
+
+
+class TestPolatisSessionPoolManager(TestCase):
+    def setUp(self):
+        self._logger = Mock()
+        self._instance = PolatisSessionPoolManager(keepalive_interval=10)
+        self._session = Mock()
+        self._session.connect.return_value = None
+        self._session.check_alive.return_value = True
+        self._instance.get_session([self._session], 'prompt', self._logger)
+        self._instance.return_session(self._session, self._logger)
+
+    def test_alive_session_reused(self):
+        self.assertIs(self._instance.get_session([self._session], 'prompt', self._logger), self._session)
+        self._session.check_alive.assert_called_once_with(10, self._logger)
+        self._session.reconnect.assert_not_called()
+
+    def test_dead_session_reconnected(self):
+        self._session.check_alive.return_value = False
+        self.assertIs(self._instance.get_session([self._session], 'prompt', self._logger), self._session)
+        self._session.reconnect.assert_called_once_with('prompt', self._logger)
+
+    def test_keepalive_removes_dead_session(self):
+        self._session.check_alive.return_value = False
+        self._instance.keepalive(self._logger)
+        self._session.disconnect.assert_called_once_with()
+        self.assertEqual(self._instance._session_manager.existing_sessions_count(), 0)
+
+    def test_keepalive_probes_outside_pool_lock(self):
+        acquired = []
+
+        def try_acquire():
+            acquired.append(self._instance._session_condition.acquire(False))
+            if acquired[-1]:
+                self._instance._session_condition.release()
+
+        def check_alive(interval, logger):
+            thread = threading.Thread(target=try_acquire)
+            thread.start()
+            thread.join()
+            return True
+
+        self._session.check_alive.side_effect = check_alive
+        self._instance.keepalive(self._logger)
+        self.assertEqual(acquired, [True])
+        self.assertIs(self._instance.get_session([self._session], 'prompt', self._logger), self._session)
@@ -0,0 +1,25 @@
+from unittest import TestCase
+
+from mock import Mock
+
+from polatis.cli.tl1_command import TL1Command
+
+
+class TestTL1Command(TestCase):
+    def test_render(self):
+        command = TL1Command("ENT-PATCH", "{dst_ports},{src_ports}").format(dst_ports="1&2", src_ports="17&18")
+        self.assertEqual(command.render("SW", 5), 'ENT-PATCH:"SW":1&2,17&18:5:;')
+
+    def test_render_not_named(self):
+        self.assertEqual(TL1Command("RTRV-HDR", named=False).render("SW", 5), 'RTRV-HDR:::5:;')
+
+    def test_prepare_command_compatible_with_template(self):
+        command = TL1Command("RTRV-EQPT", "SYSTEM", "::PARAMETER=SIZE")
+        self.assertEqual(command.prepare_command(), 'RTRV-EQPT:"<name>":SYSTEM:<counter>:::PARAMETER=SIZE;')
+
+    def test_execute_fast_path(self):
+        cli_service = Mock()
+        logger = Mock()
+        output = TL1Command("DLT-PATCH", "{port}").execute(cli_service, logger, port=3)
+        self.assertIs(output, cli_service.session.tl1_expect.return_value)
+        self.assertEqual(cli_service.session.tl1_expect.call_args[0][0].render("SW", 1), 'DLT-PATCH:"SW":3:1:;')
@@ -0,0 +1,151 @@
+from unittest import TestCase
+
+from mock import Mock
+
+from cloudshell.cli.session.session_exceptions import CommandExecutionException, ExpectedSessionException, \
+    SessionReadTimeout
+from polatis.cli.tl1_command import TL1Command
+from polatis.cli.tl1_session_polatis import TL1Session_Polatis
+from polatis.helper.adaptive_timeout import AdaptiveTimeout
+from polatis.helper.circuit_breaker import CircuitBreaker
+
+
+class TestTL1SessionPolatis(TestCase):
+    def setUp(self):
+        self._logger = Mock()
+        self._instance = TL1Session_Polatis('192.168.42.240', 'user', 'password', 3082)
+        self._instance.switch_name = 'SW'
+        self._instance._send = Mock()
+
+    def test_pipeline_expect_matches_responses_by_ctag(self):
+        self._instance._receive = Mock(side_effect=[
+            'RTRV-PATCH:"SW"::1:;\r\n   SW 17-01-01 00:00:00\r\nM  2 DENY\r\n   IIAC\r\n;',
+            '\r\n   SW 17-01-01 00:00:00\r\nM  1 COMPLD\r\n   "1,17"\r\n;'])
+
+        outputs = self._instance.pipeline_expect(['RTRV-PATCH:"<name>"::<counter>:;',
+                                                  'RTRV-INV:"<name>":OCS:<counter>:;'], self._logger)
+
+        self.assertIn('"1,17"', outputs[0])
+        self.assertNotIn('RTRV-PATCH', outputs[0])
+        self.assertIsInstance(outputs[1], CommandExecutionException)
+        self._instance._send.assert_any_call('RTRV-INV:"SW":OCS:2:;\r', self._logger)
+
+    def test_tl1_expect_response_split_across_chunks(self):
+        self._instance._receive = Mock(side_effect=[
+            '\r\n   SW 17-01-01 00:00:00\r\nM  7 COMPLD\r\n   "1,17"\r\n;\r\n   SW 17-01-01 00:00:00\r\nM ',
+            ' 1 COMPLD\r\n   "1,17"\r\n',
+            '   "2,18"\r\n;\r\n'])
+
+        output = self._instance.tl1_expect(TL1Command('RTRV-PATCH'), self._logger)
+
+        self.assertIn('"1,17"\n   "2,18"\n;', output)
+        self.assertNotIn('M  7', output)
+        self.assertEqual(self._instance._receive.call_count, 3)
+
+    def test_pipeline_expect_streams_response_to_consumer(self):
+        consumer = Mock()
+        self._instance._receive = Mock(side_effect=[
+            'RTRV-PORT-POWER:"SW":1&&3:1:;\r\n   SW 17-01-01 00:00:00\r\nM  1 COMPLD\r\n   "1:-1.50"\r\n',
+            '   "2:-2.50"\r\n',
+            '   "3:-3.50"\r\n;'])
+        self._instance._receive.side_effect = self._check_pending(self._instance._receive.side_effect)
+
+        outputs = self._instance.pipeline_expect(['RTRV-PORT-POWER:"<name>":1&&3:<counter>:;'], self._logger,
+                                                 consumers=[consumer])
+
+        self.assertEqual(''.join(call[0][0] for call in consumer.feed.call_args_list),
+                         '   "1:-1.50"\n   "2:-2.50"\n   "3:-3.50"\n;')
+        consumer.close.assert_called_once_with()
+        self.assertIn('M  1 COMPLD', outputs[0])
+        self.assertNotIn('"1:-1.50"', outputs[0])
+
+    def _check_pending(self, chunks):
+        """ Yield chunks checking that only the response header of the streamed block is kept """
+
+        for chunk in chunks:
+            self.assertNotIn('"', ''.join(self._instance._pending))
+            yield chunk
+
+    def test_tl1_expect_adaptive_timeout(self):
+        self._instance.command_timeouts = AdaptiveTimeout(min_timeout=2)
+        self._instance.command_timeouts.update('RTRV-HDR', 0.01)
+        self._instance._receive = Mock(return_value='\nM  1 COMPLD\n;')
+
+        self._instance.tl1_expect(TL1Command('RTRV-HDR', named=False), self._logger)
+        self._instance._receive.assert_called_once_with(2, self._logger)
+
+    def test_read_timeout_reported_to_circuit_breaker(self):
+        self._instance.circuit_breaker = CircuitBreaker(failures=1)
+        self._instance.command_timeouts = AdaptiveTimeout(min_timeout=2)
+        self._instance.command_timeouts.update('RTRV-HDR', 0.01)
+        self._instance._receive = Mock(side_effect=SessionReadTimeout())
+
+        self.assertRaises(ExpectedSessionException, self._instance.tl1_expect,
+                          TL1Command('RTRV-HDR', named=False), self._logger)
+        self.assertFalse(self._instance.circuit_breaker.allow())
+        self.assertEqual(self._instance.command_timeouts.timeout('RTRV-HDR', 30), 30)
+
+    def test_read_timeout_of_responding_switch_not_reported(self):
+        self._instance.circuit_breaker = CircuitBreaker(failures=1)
+        self._instance._receive = Mock(side_effect=[SessionReadTimeout(), '\nM  2 COMPLD\n;'])
+
+        self.assertRaises(ExpectedSessionException, self._instance.tl1_expect,
+                          TL1Command('RTRV-PORT-PMON', '1&&640'), self._logger)
+        self.assertTrue(self._instance.circuit_breaker.allow())
+        self._instance._send.assert_called_with('RTRV-HDR:::2:;\r', self._logger)
+
+    def test_response_received_by_probe_returned_to_timed_out_command(self):
+        self._instance.command_timeouts = AdaptiveTimeout(min_timeout=2)
+        self._instance.command_timeouts.update('ENT-PATCH', 0.01, ports=1)
+        self._instance._receive = Mock(side_effect=[SessionReadTimeout(), '\nM  1 COMPLD\n;', '\nM  2 COMPLD\n;'])
+
+        output = self._instance.tl1_expect(TL1Command('ENT-PATCH', '2,18'), self._logger)
+        self.assertIn('M  1 COMPLD', output)
+        self._instance._send.assert_called_with('RTRV-HDR:::2:;\r', self._logger)
+        self.assertFalse(self._instance._timed_out)
+
+    def test_response_after_probe_awaited_up_to_session_timeout(self):
+        self._instance.command_timeouts = AdaptiveTimeout(min_timeout=2)
+        self._instance.command_timeouts.update('ENT-PATCH', 0.01, ports=1)
+        self._instance._receive = Mock(side_effect=[SessionReadTimeout(), '\nM  2 COMPLD\n;', '\nM  1 COMPLD\n;'])
+
+        output = self._instance.tl1_expect(TL1Command('ENT-PATCH', '2,18'), self._logger)
+        self.assertIn('M  1 COMPLD', output)
+        self._instance._receive.assert_called_with(None, self._logger)
+
+    def test_connect_refused_while_circuit_is_open(self):
+        self._instance.circuit_breaker = CircuitBreaker(failures=1)
+        self._instance.circuit_breaker.record(False)
+        self._instance._initialize_session = Mock()
+
+        self.assertRaises(ExpectedSessionException, self._instance.connect, None, self._logger)
+        self._instance._initialize_session.assert_not_called()
+
+    def test_timed_out_session_is_not_used(self):
+        self._instance._receive = Mock(side_effect=SessionReadTimeout())
+        self.assertRaises(ExpectedSessionException, self._instance.tl1_expect, TL1Command('RTRV-HDR'), self._logger)
+        self._instance._send.reset_mock()
+
+        self.assertRaises(ExpectedSessionException, self._instance.tl1_expect, TL1Command('RTRV-PATCH'), self._logger)
+        self._instance._send.assert_not_called()
+        self.assertFalse(self._instance.active())
+
+    def test_autonomous_message_passed_to_callback(self):
+        self._instance.on_autonomous_message = Mock()
+        self._instance._receive = Mock(side_effect=[
+            '\r\n   SW 17-01-01 00:00:00\r\nA  3 REPT EVT PATCH\r\n;\r\n   SW 17-01-01 00:00:00\r\nM  1 COMP',
+            'LD\r\n   "1,17"\r\n;'])
+
+        output = self._instance.tl1_expect(TL1Command('RTRV-PATCH'), self._logger)
+
+        self.assertIn('"1,17"', output)
+        self.assertNotIn('REPT', output)
+        self._instance.on_autonomous_message.assert_called_once()
+        self.assertEqual(self._instance.on_autonomous_message.call_args[0][0], 'REPT EVT PATCH')
+
+    def test_password_not_logged(self):
+        self._instance._receive = Mock(return_value='\r\n   SW 17-01-01 00:00:00\r\nM  1 COMPLD\r\n;')
+        self._instance.payload_sampling = 1
+
+        self._instance.hardware_expect('ACT-USER::user:<counter>::password;', None, self._logger)
+        self.assertNotIn('password', str(self._logger.mock_calls))
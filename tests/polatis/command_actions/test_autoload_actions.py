@@ -0,0 +1,43 @@
+from unittest import TestCase
+
+from mock import Mock
+
+from polatis.command_actions.autoload_actions import AutoloadActions
+from polatis.helper.port_table import PortTable
+
+
+class TestAutoloadActions(TestCase):
+    def test_get_optical_details_chunked(self):
+        def pipeline_expect(commands, logger, consumers):
+            # responses are streamed to consumers in parts split within records
+            for consumer, body in zip(consumers, ['   "1:-1.5"\n   "2:', None, '   "1:1550,A"\n', '   "3:1310,A"\n']):
+                if body:
+                    consumer.feed(body)
+            consumers[0].feed('-2.5"\n')
+            for consumer in consumers:
+                consumer.close()
+            return ['', Exception('Error: Status "DENY"'), '', '']
+
+        session = Mock()
+        session.session.pipeline_expect.side_effect = pipeline_expect
+        port_table = PortTable(3)
+
+        AutoloadActions(session, Mock(), optical_chunk_size=2).get_optical_details(port_table)
+        commands = session.session.pipeline_expect.call_args[0][0]
+        self.assertEqual([command.render('SW', 1) for command in commands],
+                         ['RTRV-PORT-POWER:"SW":1&&2:1:;', 'RTRV-PORT-POWER:"SW":3:1:;',
+                          'RTRV-PORT-PMON:"SW":1&&2:1:;', 'RTRV-PORT-PMON:"SW":3:1:;'])
+        self.assertEqual(list(port_table.power[1:3]), [-1.5, -2.5])
+        self.assertEqual((port_table.wavelength[1], port_table.wavelength[3]), (1550, 1310))
+
+    def test_get_autoload_details_without_optical(self):
+        session = Mock()
+        session.session.pipeline_expect.return_value = ['', '', '   "1,2"\n']
+        actions = AutoloadActions(session, Mock())
+        actions._parse_required = Mock(side_effect=lambda commands, outputs, details: details.update(Connections={}))
+
+        details = actions.get_autoload_details(ports_count=2, with_optical=False)
+        verbs = [command.verb for command in session.session.pipeline_expect.call_args[0][0]]
+        self.assertNotIn('RTRV-PORT-POWER', verbs)
+        self.assertNotIn('RTRV-PORT-PMON', verbs)
+        self.assertEqual(details["Ports"].ports_count, 2)
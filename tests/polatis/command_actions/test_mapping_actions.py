@@ -0,0 +1,76 @@
+from unittest import TestCase
+
+from mock import Mock
+
+from cloudshell.cli.session.session_exceptions import ExpectedSessionException
+
+from polatis.command_actions.mapping_actions import MappingActions
+
+
+class TestMappingActions(TestCase):
+    def setUp(self):
+        self._cli_service = Mock()
+        self._logger = Mock()
+        self._instance = MappingActions(self._cli_service, self._logger)
+
+    def _sent_commands(self):
+        return [call[0][0].render('SW', 1) for call in self._cli_service.session.tl1_expect.call_args_list]
+
+    def test_map_uni_batch_single_command(self):
+        output = Mock()
+        self._cli_service.session.tl1_expect.return_value = output
+
+        self.assertIs(self._instance.map_uni_batch([(17, 1), (18, 2)]), output)
+        self.assertEqual(self._sent_commands(), ['ENT-PATCH:"SW":1&2,17&18:1:;'])
+
+    def test_map_uni_batch_reports_failed_pairs(self):
+        outputs = {'ENT-PATCH': Exception('Error: Status "DENY"'),
+                   'RTRV-PATCH': '   "1,17"\n   "3,19"\n'}
+
+        def tl1_expect(command, logger):
+            result = outputs[command.verb]
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+        self._cli_service.session.tl1_expect.side_effect = tl1_expect
+
+        with self.assertRaisesRegexp(Exception, r'^Failed to map ports 18->2: '):
+            self._instance.map_uni_batch([(17, 1), (18, 2), (19, 3)])
+
+    def test_map_clear_range_compressed(self):
+        self._instance.map_clear([3, 1, 2, 17, 18, 19, 5])
+        self.assertEqual(self._sent_commands(), ['DLT-PATCH:"SW":1&&3&5&17&&19:1:;'])
+
+    def test_patches_diff(self):
+        deleted, added = MappingActions.patches_diff(current={(1, 17), (2, 18), (5, 21)}, target={(1, 17), (2, 19)})
+        self.assertEqual(deleted, {(2, 18)})
+        self.assertEqual(added, {(2, 19)})
+
+    def test_apply_patches_single_round_trip(self):
+        session = self._cli_service.session
+        session.pipeline_expect.return_value = ['', '']
+
+        self._instance.apply_patches({(1, 20), (7, 23)}, {(1, 17), (2, 18), (3, 19)})
+        commands = session.pipeline_expect.call_args[0][0]
+        self.assertEqual([command.render('SW', 1) for command in commands],
+                         ['DLT-PATCH:"SW":1:1:;', 'ENT-PATCH:"SW":1&&3,17&&19:1:;'])
+
+    def test_apply_patches_rollback(self):
+        session = self._cli_service.session
+        session.pipeline_expect.side_effect = [[Exception('Error: Status "DENY"')], ['', '']]
+        session.tl1_expect.return_value = '   "1,17"\n'
+
+        self.assertRaises(Exception, self._instance.apply_patches, {(1, 20)}, {(1, 17), (2, 18)})
+        commands = session.pipeline_expect.call_args[0][0]
+        self.assertEqual([command.render('SW', 1) for command in commands],
+                         ['DLT-PATCH:"SW":1:1:;', 'ENT-PATCH:"SW":1,20:1:;'])
+
+    def test_apply_patches_not_restored_on_failed_session(self):
+        session = self._cli_service.session
+        session.active.return_value = False
+        session.pipeline_expect.side_effect = ExpectedSessionException('Session', 'Socket closed by timeout')
+
+        self.assertRaises(ExpectedSessionException, self._instance.apply_patches, {(1, 20)}, {(1, 17)})
+        session.tl1_expect.assert_not_called()
+        self.assertEqual(session.pipeline_expect.call_count, 1)
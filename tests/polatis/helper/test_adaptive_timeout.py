@@ -0,0 +1,39 @@
+from unittest import TestCase
+
+from polatis.helper.adaptive_timeout import AdaptiveTimeout
+
+
+class TestAdaptiveTimeout(TestCase):
+    def setUp(self):
+        self._instance = AdaptiveTimeout(min_timeout=2, margin=1)
+
+    def test_unknown_verb_uses_session_timeout(self):
+        self.assertEqual(self._instance.timeout("RTRV-HDR", 30), 30)
+
+    def test_timeout_follows_latency(self):
+        for _ in range(20):
+            self._instance.update("RTRV-HDR", 0.01)
+            self._instance.update("RTRV-PORT-PMON", 4.0)
+
+        self.assertEqual(self._instance.timeout("RTRV-HDR", 30), 2)
+        self.assertAlmostEqual(self._instance.timeout("RTRV-PORT-PMON", 30), 5, delta=0.5)
+        self.assertEqual(self._instance.timeout("RTRV-PORT-PMON", 3), 3)
+
+    def test_backoff_restores_session_timeout(self):
+        self._instance.update("RTRV-HDR", 0.01)
+        self._instance.backoff("RTRV-HDR")
+        self.assertEqual(self._instance.timeout("RTRV-HDR", 30), 30)
+
+    def test_disabled(self):
+        self._instance.min_timeout = 0
+        self._instance.update("RTRV-HDR", 0.01)
+        self.assertEqual(self._instance.timeout("RTRV-HDR", 30), 30)
+
+    def test_estimate_per_command_size(self):
+        for _ in range(20):
+            self._instance.update("ENT-PATCH", 0.01, 1)
+        self.assertEqual(self._instance.timeout("ENT-PATCH", 30, 1), 2)
+        self.assertEqual(self._instance.timeout("ENT-PATCH", 30, 128), 30)
+
+        self._instance.backoff("ENT-PATCH")
+        self.assertEqual(self._instance.timeout("ENT-PATCH", 30, 1), 30)
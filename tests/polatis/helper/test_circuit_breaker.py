@@ -0,0 +1,36 @@
+from unittest import TestCase
+
+from mock import patch
+
+from polatis.helper.circuit_breaker import CircuitBreaker
+
+
+@patch('polatis.helper.circuit_breaker.time')
+class TestCircuitBreaker(TestCase):
+    def setUp(self):
+        self._instance = CircuitBreaker(failures=2, reset_timeout=30)
+
+    def test_opens_after_consecutive_failures(self, time_mod):
+        time_mod.time.return_value = 100
+        self._instance.record(False)
+        self._instance.record(True)
+        self._instance.record(False)
+        self.assertTrue(self._instance.allow())
+
+        self._instance.record(False)
+        self.assertFalse(self._instance.allow())
+        self.assertEqual(self._instance.retry_after, 30)
+
+    def test_trial_after_reset_timeout(self, time_mod):
+        time_mod.time.return_value = 100
+        self._instance.record(False)
+        self._instance.record(False)
+
+        time_mod.time.return_value = 130
+        self.assertTrue(self._instance.allow())
+        self._instance.record(False)
+        self.assertFalse(self._instance.allow())
+
+        time_mod.time.return_value = 160
+        self._instance.record(True)
+        self.assertTrue(self._instance.allow())
@@ -0,0 +1,56 @@
+import json
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from mock import Mock
+
+from polatis.helper.command_metrics import CommandMetrics, measured_command, tl1_verb
+from polatis.helper.trace_buffer import TRACE
+
+
+class TestCommandMetrics(TestCase):
+    def setUp(self):
+        self._instance = CommandMetrics()
+
+    def test_record_grouped_by_driver_command(self):
+        with self._instance.command_context("map_bidi"):
+            self._instance.record("ENT-PATCH", 0.02, "COMPLD", 30, 60)
+            self._instance.record("ENT-PATCH", 0.2, "DENY", 30, 80)
+        self._instance.record("RTRV-HDR", 0.001, "COMPLD")
+
+        stats = self._instance.snapshot()
+        self.assertEqual(sorted(stats), ["-", "map_bidi"])
+        ent_patch = stats["map_bidi"]["ENT-PATCH"]
+        self.assertEqual(ent_patch["count"], 2)
+        self.assertEqual(ent_patch["bytes_received"], 140)
+        self.assertEqual(ent_patch["status"], {"COMPLD": 1, "DENY": 1})
+        self.assertEqual(ent_patch["histogram"][1], 1)
+        self.assertEqual(ent_patch["histogram"][4], 1)
+
+    def test_dump(self):
+        path = os.path.join(tempfile.mkdtemp(), "polatis", "metrics.json")
+        try:
+            self._instance.record_retry("ACT-USER")
+            self._instance.dump(path)
+            with open(path) as metrics_file:
+                stats = json.load(metrics_file)["commands"]
+            self.assertEqual(stats["-"]["ACT-USER"]["retries"], 1)
+            self.assertEqual(stats["-"]["ACT-USER"]["histogram"]["le_inf"], 0)
+        finally:
+            shutil.rmtree(os.path.dirname(os.path.dirname(path)))
+
+    def test_tl1_verb(self):
+        self.assertEqual(tl1_verb('ENT-PATCH:"SW":1,17:5:;'), "ENT-PATCH")
+
+    def test_measured_command_flushes_trace_on_error(self):
+        logger = Mock()
+
+        @measured_command
+        def map_clear(driver):
+            TRACE.event("DLT-PATCH", "1&&4", 0.01, "DENY")
+            raise Exception("DENY")
+
+        self.assertRaises(Exception, map_clear, Mock(_logger=logger))
+        self.assertIn("map_clear DLT-PATCH 1&&4", logger.info.call_args[0][0])
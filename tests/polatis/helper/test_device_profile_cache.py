@@ -0,0 +1,39 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from mock import Mock
+
+from polatis.helper.device_profile_cache import DeviceProfileCache
+
+
+class TestDeviceProfileCache(TestCase):
+    def setUp(self):
+        self._dir = tempfile.mkdtemp()
+        self._path = os.path.join(self._dir, 'polatis', 'profiles.json')
+        self._instance = DeviceProfileCache(self._path, Mock())
+
+    def tearDown(self):
+        shutil.rmtree(self._dir)
+
+    def test_get_unknown_host(self):
+        self.assertEqual(self._instance.get('192.168.42.240'), {})
+        self.assertFalse(os.path.exists(self._path))
+
+    def test_update_persisted(self):
+        self._instance.update('192.168.42.240', serial='SN1', size=[16, 16])
+        self._instance.update('192.168.42.240', transport='TL1')
+
+        profile = DeviceProfileCache(self._path, Mock()).get('192.168.42.240')
+        self.assertEqual(profile, {'serial': 'SN1', 'size': [16, 16], 'transport': 'TL1'})
+
+    def test_remove(self):
+        self._instance.update('192.168.42.240', serial='SN1')
+        self._instance.remove('192.168.42.240')
+        self.assertEqual(DeviceProfileCache(self._path, Mock()).get('192.168.42.240'), {})
+
+    def test_disabled(self):
+        instance = DeviceProfileCache(None, Mock())
+        instance.update('192.168.42.240', serial='SN1')
+        self.assertEqual(instance.get('192.168.42.240'), {'serial': 'SN1'})
@@ -0,0 +1,61 @@
+import threading
+from unittest import TestCase
+
+from mock import Mock
+
+from cloudshell.layer_one.core.layer_one_driver_exception import LayerOneDriverException
+
+from polatis.helper.device_registry import DeviceRegistry
+
+
+class TestDeviceRegistry(TestCase):
+    def setUp(self):
+        self._instance = DeviceRegistry(Mock)
+
+    def test_first_login_uses_default_device(self):
+        default = self._instance.default
+        self.assertIs(self._instance.register('192.168.42.240'), default)
+        self.assertEqual(default.address, '192.168.42.240')
+
+    def test_device_selected_by_address_prefix(self):
+        first = self._instance.register('192.168.42.240')
+        second = self._instance.register('192.168.42.241')
+        self.assertIsNot(first.cli_handler, second.cli_handler)
+        self.assertIs(self._instance.get('192.168.42.240/1/21'), first)
+        self.assertIs(self._instance.get(['192.168.42.241/1/2', '192.168.42.241/1/3']), second)
+        self.assertIs(self._instance.get(None), second)
+        self.assertRaisesRegexp(LayerOneDriverException, '10.0.0.1 is not logged in',
+                                self._instance.get, '10.0.0.1/1/1')
+
+    def test_unknown_switch_with_single_device(self):
+        device = self._instance.register('192.168.42.240')
+        self.assertIs(self._instance.get('10.0.0.1/1/1'), device)
+
+    def test_activate(self):
+        device = self._instance.register('192.168.42.240')
+        self._instance.register('192.168.42.241')
+        with self._instance.activate(device):
+            self.assertIs(self._instance.current, device)
+        self.assertIs(self._instance.current, self._instance.default)
+
+    def test_logged_in_device_kept_per_thread(self):
+        first_logged_in = threading.Event()
+        second_logged_in = threading.Event()
+        selected = {}
+
+        def connection(address, wait, done):
+            self._instance.register(address)
+            done.set()
+            wait.wait(1)
+            selected[address] = self._instance.get(None).address
+
+        first = threading.Thread(target=connection, args=('192.168.42.240', second_logged_in, first_logged_in))
+        second = threading.Thread(target=connection, args=('192.168.42.241', first_logged_in, second_logged_in))
+        first.start()
+        first_logged_in.wait(1)
+        second.start()
+        first.join()
+        second.join()
+
+        self.assertEqual(selected, {'192.168.42.240': '192.168.42.240', '192.168.42.241': '192.168.42.241'})
+        self.assertEqual(self._instance.get(None).address, '192.168.42.241')
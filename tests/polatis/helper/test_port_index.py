@@ -0,0 +1,36 @@
+from unittest import TestCase
+
+from polatis.helper.port_index import PortIndex
+
+
+class TestPortIndex(TestCase):
+    def setUp(self):
+        self._logical = PortIndex(10, 4, is_logical=True)
+        self._physical = PortIndex(10, 4)
+
+    def test_logical_ports(self):
+        self.assertEqual(self._logical.ingress('192.168.42.240/1/3'), 3)
+        self.assertEqual(self._logical.egress('192.168.42.240/1/03'), 7)
+        self.assertEqual([self._logical.switch_port(port) for port in range(12)], [0, 1, 2, 3, 4, 1, 2, 3, 4, 0, 0, 0])
+        self.assertEqual(self._logical.ingress_egress(3), (3, 7))
+        self.assertTrue(self._logical.is_ingress(4))
+        self.assertFalse(self._logical.is_ingress(5))
+        self.assertRaises(IndexError, self._logical.port, '192.168.42.240/1/5')
+
+    def test_physical_ports(self):
+        self.assertEqual(self._physical.ingress('192.168.42.240/1/9'), 9)
+        self.assertEqual(self._physical.egress('192.168.42.240/1/9'), 9)
+        self.assertEqual(self._physical.switch_port(10), 10)
+        self.assertRaises(IndexError, self._physical.port, '192.168.42.240/1/0')
+
+    def test_logical_patches(self):
+        self.assertEqual(self._logical.uni_patch('1.1.1.1/1', '1.1.1.1/2'), (2, 5))
+        self.assertEqual(self._logical.bidi_patches('1.1.1.1/1', '1.1.1.1/2'), [(2, 5), (1, 6)])
+        self.assertEqual(self._logical.clear_to_port('1.1.1.1/1', '1.1.1.1/2'), 2)
+        self.assertEqual(self._logical.clear_ports('1.1.1.1/2'), [2, 6])
+
+    def test_physical_patches(self):
+        self.assertRaises(Exception, self._physical.uni_patch, '1.1.1.1/1', '1.1.1.1/7')
+        self.assertEqual(self._physical.bidi_patches('1.1.1.1/7', '1.1.1.1/1'), [(1, 7)])
+        self.assertEqual(self._physical.clear_to_port('1.1.1.1/7', '1.1.1.1/1'), 1)
+        self.assertEqual(self._physical.clear_ports('1.1.1.1/7'), [7])
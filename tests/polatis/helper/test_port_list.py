@@ -0,0 +1,38 @@
+from unittest import TestCase
+
+from polatis.helper.port_list import count_port_list, decode_port_list, encode_port_list, encode_port_pairs, encode_port_range, port_ranges, \
+    split_port_range
+
+
+class TestPortList(TestCase):
+    def test_port_ranges(self):
+        self.assertEqual(port_ranges([10, 1, 2, 3, 7, 9, 2]), [(1, 3), (7, 7), (9, 10)])
+
+    def test_encode_port_list(self):
+        self.assertEqual(encode_port_list([1, 2, 3, 4, 7, 9, 10]), '1&&4&7&9&10')
+
+    def test_encode_port_list_accepts_strings(self):
+        self.assertEqual(encode_port_list(['5', '17']), '5&17')
+
+    def test_encode_empty_port_list(self):
+        self.assertEqual(encode_port_list([]), '')
+
+    def test_decode_port_list(self):
+        self.assertEqual(decode_port_list('1&&4&7&9&10'), [1, 2, 3, 4, 7, 9, 10])
+        self.assertEqual(decode_port_list(''), [])
+
+    def test_encode_port_pairs(self):
+        self.assertEqual(encode_port_pairs([(3, 19), (1, 17), (2, 18), (5, 30), (6, 32)]), ('1&&3&5&6', '17&&19&30&32'))
+
+    def test_split_port_range(self):
+        self.assertEqual(split_port_range(1, 10, 4), [(1, 4), (5, 8), (9, 10)])
+        self.assertEqual(split_port_range(1, 10), [(1, 10)])
+
+    def test_encode_port_range(self):
+        self.assertEqual(encode_port_range(1, 16), '1&&16')
+        self.assertEqual(encode_port_range(5, 5), '5')
+
+    def test_count_port_list(self):
+        self.assertEqual(count_port_list('1&&4&7&9&&640'), 637)
+        self.assertEqual(count_port_list(''), 0)
+        self.assertEqual(count_port_list('admin'), 0)
@@ -0,0 +1,36 @@
+from unittest import TestCase
+
+from polatis.helper.port_index import PortIndex
+from polatis.helper.port_table import PortTable
+
+
+class TestPortTable(TestCase):
+    def setUp(self):
+        self._instance = PortTable(8)
+        self._instance.update_connections([(1, 6), (2, 5)])
+        self._instance.update_power([(1, -1.0), (6, -6.0), (9, -9.0)])
+        self._instance.update_wavelength([(1, 1550.0)])
+        self._physical = PortIndex(8, 4)
+        self._logical = PortIndex(8, 4, is_logical=True)
+
+    def test_physical_view(self):
+        ports = list(self._instance.iter_ports(self._physical))
+        self.assertEqual(len(ports), 8)
+        self.assertEqual(ports[0], (1, 6, 1550.0, -1.0, None))
+        self.assertEqual(ports[5], (6, 1, None, None, -6.0))
+        self.assertEqual(ports[7], (8, 0, None, None, None))
+
+    def test_logical_view(self):
+        ports = list(self._instance.iter_ports(self._logical))
+        self.assertEqual(len(ports), 4)
+        self.assertEqual(ports[0], (1, 2, 1550.0, -1.0, None))
+        self.assertEqual(ports[1], (2, 1, None, None, -6.0))
+        self.assertEqual(ports[2], (3, 0, None, None, None))
+
+    def test_get_port_matches_views(self):
+        for port_index in (self._physical, self._logical):
+            for record in self._instance.iter_ports(port_index):
+                self.assertEqual(self._instance.get_port(record[0], port_index), record)
+
+    def test_get_port_out_of_range(self):
+        self.assertRaises(IndexError, self._instance.get_port, 5, self._logical)
@@ -0,0 +1,48 @@
+from unittest import TestCase
+from xml.etree import ElementTree
+
+from cloudshell.layer_one.core.response.resource_info.entities.chassis import Chassis
+from cloudshell.layer_one.core.response.resource_info.entities.port import Port
+from cloudshell.layer_one.core.response.resource_info.resource_info_builder import ResourceInfoBuilder
+
+from polatis.helper.resource_description import StreamingResourceDescriptionResponseInfo
+
+
+class TestStreamingResourceDescriptionResponseInfo(TestCase):
+    def setUp(self):
+        self._chassis = Chassis("", "192.168.42.240", "Polatis Chassis", "SN1")
+        self._chassis.set_model_name("OST")
+
+        def iter_ports():
+            for port_id, mapped_port_id in [("1", "3"), ("2", None), ("3", "1")]:
+                port = Port(port_id, "Generic L1 Port", "SN1.{}".format(port_id))
+                port.set_tx_power("-1.5")
+                yield port, mapped_port_id
+
+        self._instance = StreamingResourceDescriptionResponseInfo(self._chassis, iter_ports)
+
+    def test_iter_xml_matches_xml_node(self):
+        self._instance.BATCH_SIZE = 2
+        output = "".join(self._instance.iter_xml())
+
+        self.assertEqual(output, ElementTree.tostring(self._instance.build_xml_node(), encoding="utf-8"))
+        self.assertIn('Address="192.168.42.240/1"', output)
+        self.assertIn('<IncomingMapping>192.168.42.240/3</IncomingMapping>', output)
+        self.assertEqual(output.count('<IncomingMapping>'), 2)
+
+    def test_port_node_matches_builder(self):
+        port = Port("1", "Generic L1 Port", "SN1.1")
+        port.set_tx_power("-1.5")
+        port.set_rx_power("-2.5")
+        port.set_parent_resource(self._chassis)
+        mapped_port = Port("3")
+        mapped_port.set_parent_resource(self._chassis)
+        port.add_mapping(mapped_port)
+
+        self.assertEqual(
+            ElementTree.tostring(self._instance._build_port_node(port, port.address, mapped_port.address)),
+            ElementTree.tostring(ResourceInfoBuilder._build_resource_node(port)))
+
+    def test_ports_not_kept(self):
+        list(self._instance.iter_xml())
+        self.assertEqual(self._chassis.child_resources, {})
@@ -0,0 +1,21 @@
+from unittest import TestCase
+
+from polatis.helper.tl1_parser import PortValuesParser
+
+
+class TestPortValuesParser(TestCase):
+    def test_feed_chunks(self):
+        parser = PortValuesParser(PortValuesParser.POWER_PATTERN)
+        records = list(parser.feed('M  5 COMPLD\n   "1:-1.50"\n   "2:-'))
+        records += list(parser.feed('2.25"\n   "3:NA"\n   "4:0.00"'))
+        records += list(parser.close())
+        self.assertEqual(records, [(1, -1.5), (2, -2.25), (4, 0.0)])
+
+    def test_parse_wavelength(self):
+        parser = PortValuesParser(PortValuesParser.WAVELENGTH_PATTERN)
+        output = '   "1:1550.00,-3.1,OK"\n   "17:1310.00,-2.0,OK"\n;'
+        self.assertEqual(dict(parser.parse(output)), {1: 1550.0, 17: 1310.0})
+
+    def test_parse_status(self):
+        parser = PortValuesParser(PortValuesParser.STATUS_PATTERN, converter=str)
+        self.assertEqual(list(parser.parse('"1:OPEN"\n"2:CLOSED"')), [(1, 'OPEN'), (2, 'CLOSED')])
@@ -0,0 +1,27 @@
+from unittest import TestCase
+
+from mock import Mock
+
+from polatis.helper.trace_buffer import TraceBuffer, tl1_ports
+
+
+class TestTraceBuffer(TestCase):
+    def setUp(self):
+        self._logger = Mock()
+        self._instance = TraceBuffer(size=2)
+
+    def test_keeps_latest_events(self):
+        for port in range(3):
+            self._instance.event("DLT-PATCH", str(port), 0.01, "COMPLD")
+        self.assertEqual(self._instance.flush(self._logger), 2)
+        self.assertIn("DLT-PATCH 2 0.010s COMPLD", self._logger.info.call_args[0][0])
+        self.assertEqual(self._instance.flush(self._logger), 0)
+
+    def test_disabled(self):
+        self._instance.resize(0)
+        self._instance.event("DLT-PATCH", "1", 0.01, "COMPLD")
+        self.assertEqual(self._instance.flush(self._logger), 0)
+
+    def test_tl1_ports(self):
+        self.assertEqual(tl1_ports('ENT-PATCH:"SW":1&&4,17&&20:5:;'), '1&&4,17&&20')
+        self.assertEqual(tl1_ports('RTRV-HDR;'), '')
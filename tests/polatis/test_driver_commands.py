@@ -1,7 +1,9 @@
+import time
 from unittest import TestCase
 
-from mock import Mock
+from mock import Mock, MagicMock, patch
 
+from cloudshell.cli.session.session_exceptions import ExpectedSessionException
 from cloudshell.layer_one.core.driver_commands_interface import DriverCommandsInterface
 from polatis.driver_commands import DriverCommands
 
@@ -13,6 +15,194 @@ class TestDriverCommands(TestCase):
         self._logger = Mock()
         self._runtime_config_instance = Mock()
         self._instance = DriverCommands(self._logger, self._runtime_config_instance)
+        self._instance._cli_handler = MagicMock()
 
     def test_implementing_interface(self):
         self.assertIsInstance(self._instance, DriverCommandsInterface)
+
+    def test_get_state_id_not_set(self):
+        self.assertEqual(self._instance.get_state_id()._state_id, '-1')
+        self._instance._cli_handler.default_mode_service.assert_not_called()
+
+    @patch('polatis.driver_commands.AutoloadActions')
+    def test_get_state_id_unchanged(self, autoload_actions_class):
+        autoload_actions = autoload_actions_class.return_value
+        autoload_actions.get_switch_serial.return_value = 'SN1'
+        autoload_actions.get_connections.return_value = {1: 17, 17: 1}
+
+        self._instance.set_state_id('12345')
+        self.assertEqual(self._instance.get_state_id()._state_id, '12345')
+        autoload_actions.get_switch_serial.assert_called_once_with()
+
+    @patch('polatis.driver_commands.AutoloadActions')
+    def test_get_state_id_changed_on_device(self, autoload_actions_class):
+        autoload_actions = autoload_actions_class.return_value
+        autoload_actions.get_switch_serial.return_value = 'SN1'
+        autoload_actions.get_connections.return_value = {1: 17, 17: 1}
+
+        self._instance.set_state_id('12345')
+        autoload_actions.get_connections.return_value = {}
+        self.assertEqual(self._instance.get_state_id()._state_id, '-1')
+
+    @patch('polatis.driver_commands.AutoloadActions')
+    def test_get_attribute_value_uses_snapshot(self, autoload_actions_class):
+        def get_optical_details(port_table, ranges=None):
+            port_table.update_power([(1, -1.5), (3, -7.0)])
+            port_table.update_wavelength([(1, 1550.125), (2, 1310.0)])
+
+        autoload_actions_class.return_value.get_optical_details.side_effect = get_optical_details
+        self._instance.total_ports_count, self._instance.logical_ports_count = 4, 2
+        self._instance._optical_snapshot_ttl = 10
+        self._instance._optical_chunk_size = 0
+        self._instance._cli_handler.session_pool_size = 1
+
+        self.assertEqual(self._instance.get_attribute_value('1.1.1.1/1', 'Tx Power (dBm)')._value, '-1.5')
+        self.assertEqual(self._instance.get_attribute_value('1.1.1.1/3', 'Rx Power (dBm)')._value, '-7')
+        self.assertEqual(self._instance.get_attribute_value('1.1.1.1/1', 'Wavelength')._value, '1550.125')
+        self.assertEqual(self._instance.get_attribute_value('1.1.1.1/2', 'Wavelength')._value, '1310')
+        autoload_actions_class.return_value.get_optical_details.assert_called_once()
+
+    def test_get_attribute_value_not_supported(self):
+        self.assertRaises(Exception, self._instance.get_attribute_value, '1.1.1.1/1', 'Protocol')
+
+    @patch('polatis.driver_commands.SystemActions')
+    @patch('polatis.driver_commands.AutoloadActions')
+    def test_warm_up_prefetches_size_and_patch_table(self, autoload_actions_class, system_actions_class):
+        autoload_actions = autoload_actions_class.return_value
+        autoload_actions.get_switch_serial.return_value = 'SN1'
+        autoload_actions.get_connections.return_value = {1: 17, 17: 1}
+        system_actions_class.return_value.get_device_size.return_value = (16, 16)
+        self._instance._cli_handler.session_pool_size = 2
+        self._instance._run_concurrently = Mock()
+        self._instance._profile_cache = Mock()
+        self._instance._prefetch_ttl = 5
+
+        self._instance._warm_up(self._instance._devices.current)
+        self.assertEqual((self._instance.total_ports_count, self._instance.logical_ports_count), (32, 16))
+        self.assertEqual(len(self._instance._run_concurrently.call_args[0]), 2)
+
+        self._instance.set_state_id('12345')
+        autoload_actions.get_connections.assert_called_once_with()
+        self.assertIsNone(self._instance._patch_table)
+
+    @patch('polatis.driver_commands.SystemActions')
+    @patch('polatis.driver_commands.AutoloadActions')
+    def test_warm_up_drops_patch_table_changed_meanwhile(self, autoload_actions_class, system_actions_class):
+        def get_connections():
+            # mapping command completed while the patch table was read
+            self._instance._patch_changes += 1
+            return {1: 17, 17: 1}
+
+        autoload_actions_class.return_value.get_connections.side_effect = get_connections
+        system_actions_class.return_value.get_device_size.return_value = (16, 16)
+        self._instance._cli_handler.session_pool_size = 2
+        self._instance._run_concurrently = Mock()
+
+        self._instance._warm_up(self._instance._devices.current)
+        self.assertIsNone(self._instance._patch_table)
+
+    @patch('polatis.driver_commands.SystemActions')
+    @patch('polatis.driver_commands.AutoloadActions')
+    def test_warm_up_with_single_session_skips_patch_table(self, autoload_actions_class, system_actions_class):
+        system_actions_class.return_value.get_device_size.return_value = (16, 16)
+        self._instance._cli_handler.session_pool_size = 1
+        self._instance._run_concurrently = Mock()
+        self._instance._profile_cache = Mock()
+
+        self._instance._warm_up(self._instance._devices.current)
+        self._logger.warn.assert_not_called()
+        autoload_actions_class.return_value.get_connections.assert_not_called()
+        self._instance._run_concurrently.assert_not_called()
+
+    def test_warm_up_only_cold_device(self):
+        self._instance._prefetch_ttl = 5
+        self._instance._cli_handler.session_pool_size = 1
+        self.assertTrue(self._instance._needs_warm_up())
+
+        self._instance.total_ports_count, self._instance.logical_ports_count = 32, 16
+        self.assertFalse(self._instance._needs_warm_up())
+
+        self._instance._cli_handler.session_pool_size = 2
+        self._instance._cli_handler.sessions_count = 2
+        self.assertTrue(self._instance._needs_warm_up())
+        self._instance._patch_table, self._instance._patch_table_time = {}, time.time()
+        self.assertFalse(self._instance._needs_warm_up())
+        self._instance._cli_handler.sessions_count = 1
+        self.assertTrue(self._instance._needs_warm_up())
+
+    @patch('polatis.driver_commands.AutoloadActions')
+    def test_autoload_uses_prefetched_patch_table(self, autoload_actions_class):
+        autoload_actions = autoload_actions_class.return_value
+        autoload_actions.get_autoload_details.return_value = {"Size": None}
+        self._instance._patch_table, self._instance._patch_table_time = {1: 17, 17: 1}, time.time()
+        self._instance._prefetch_ttl = 5
+        self._instance._cli_handler.session_pool_size = 1
+
+        self._instance._get_autoload_details()
+        self.assertEqual(autoload_actions.get_autoload_details.call_args[1]["connections"], {1: 17, 17: 1})
+        self.assertIsNone(self._instance._patch_table)
+
+    @patch('polatis.driver_commands.MappingActions')
+    @patch('polatis.driver_commands.AutoloadActions')
+    def test_mapping_drops_prefetched_patch_table(self, autoload_actions_class, mapping_actions_class):
+        autoload_actions_class.return_value.get_connections.return_value = {1: 17, 17: 1}
+        self._instance._patch_table, self._instance._patch_table_time = {}, 0
+        self._instance._prefetch_ttl = 5
+        self._instance.total_ports_count, self._instance.logical_ports_count = 32, 16
+
+        self._instance.map_clear_to('1.1.1.1/1', ['1.1.1.1/17'])
+        self.assertIsNone(self._instance._patch_table)
+
+    @patch('polatis.driver_commands.AutoloadActions')
+    def test_get_state_id_uses_patch_mirror(self, autoload_actions_class):
+        self._instance.serial_number = 'SN1'
+        self._instance._patch_monitor = Mock(connections={1: 17, 17: 1})
+
+        self._instance.set_state_id('12345')
+        self.assertEqual(self._instance.get_state_id()._state_id, '12345')
+        self._instance._patch_monitor.connections = {}
+        self.assertEqual(self._instance.get_state_id()._state_id, '-1')
+        self._instance._cli_handler.default_mode_service.assert_not_called()
+        autoload_actions_class.return_value.get_connections.assert_not_called()
+
+    @patch('polatis.driver_commands.MappingActions')
+    @patch('polatis.driver_commands.AutoloadActions')
+    def test_get_state_id_detects_change_after_driver_mapping(self, autoload_actions_class, mapping_actions_class):
+        autoload_actions = autoload_actions_class.return_value
+        autoload_actions.get_switch_serial.return_value = 'SN1'
+        autoload_actions.get_connections.return_value = {}
+        self._instance.total_ports_count, self._instance.logical_ports_count = 32, 16
+        self._instance.set_state_id('12345')
+
+        autoload_actions.get_connections.return_value = {1: 17, 17: 1}
+        self._instance.map_bidi('1.1.1.1/1', '1.1.1.1/17')
+
+        # changed outside the driver before the state id was checked
+        autoload_actions.get_connections.return_value = {1: 18, 18: 1}
+        self.assertEqual(self._instance.get_state_id()._state_id, '-1')
+
+    def _fail_session_while_applying(self, mapping_actions_class):
+        session = self._instance._cli_handler.default_mode_service.return_value.__enter__.return_value
+        session.session.active.return_value = False
+        self._instance._get_port_index = Mock(return_value=Mock(bidi_patches=lambda src, dst: [(1, 18)]))
+        self._instance._get_connections = Mock(return_value={1: 17, 17: 1})
+        mapping_actions = mapping_actions_class.return_value
+        mapping_actions.apply_patches.side_effect = ExpectedSessionException('Session', 'Socket closed by timeout')
+        return mapping_actions
+
+    @patch('polatis.driver_commands.MappingActions')
+    def test_apply_connections_restored_on_new_session_after_timeout(self, mapping_actions_class):
+        mapping_actions = self._fail_session_while_applying(mapping_actions_class)
+
+        self.assertRaises(ExpectedSessionException, self._instance.apply_connections,
+                          [('192.168.42.240/1/1', '192.168.42.240/1/18')])
+        mapping_actions.restore_patches.assert_called_once_with({(1, 17)}, {(1, 18)})
+        self.assertEqual(self._instance._cli_handler.default_mode_service.call_count, 2)
+
+    @patch('polatis.driver_commands.MappingActions')
+    def test_apply_connections_rollback_not_performed(self, mapping_actions_class):
+        mapping_actions = self._fail_session_while_applying(mapping_actions_class)
+        mapping_actions.restore_patches.side_effect = ExpectedSessionException('Session', 'Socket closed')
+
+        self.assertRaisesRegexp(Exception, 'rollback not performed', self._instance.apply_connections,
+                                [('192.168.42.240/1/1', '192.168.42.240/1/18')])
@@ -1,8 +1,12 @@
 from unittest import TestCase
+from xml.etree.ElementTree import Element
 
 from mock import patch, Mock, call
 
-from main import Main
+from cloudshell.layer_one.core.response.command_response import CommandResponse
+from cloudshell.layer_one.core.response.command_responses_builder import CommandResponsesBuilder
+from cloudshell.layer_one.core.response.response_info import GetStateIdResponseInfo
+from main import LazyDriverCommands, Main, StreamingConnectionHandler
 
 
 class TestMain(TestCase):
@@ -50,11 +54,12 @@ class TestMain(TestCase):
     @patch('main.importlib')
     @patch('main.datetime')
     @patch('main.RuntimeConfiguration')
-    @patch('main.XMLLogger')
+    @patch('main.StreamingXMLLogger')
     @patch('main.get_qs_logger')
     @patch('main.CommandExecutor')
+    @patch('main.driver_listener')
     @patch('main.DriverListener')
-    def test_run_driver(self, driver_listener_class, command_executor_class,
+    def test_run_driver(self, driver_listener_class, driver_listener_mod, command_executor_class,
                         get_qs_logger_mod, xml_logger_class, runtime_configuration_class, datetime_mod, importlib_mod,
                         os_mod):
         config_path = Mock()
@@ -97,8 +102,44 @@ class TestMain(TestCase):
                                                   log_category='COMMANDS')
         runtime_config_instance.read_key.assert_called_once_with('LOGGING.LEVEL', 'INFO')
         command_logger.setLevel.assert_called_once_with(log_level)
-        importlib_mod.import_module.assert_called_once_with('{}.driver_commands'.format(driver_name), package=None)
-        driver_commands_mod.DriverCommands.assert_called_once_with(command_logger, runtime_config_instance)
-        command_executor_class.assert_called_once_with(driver_commands_inst, command_logger)
+        importlib_mod.import_module.assert_not_called()
+        driver_instance = command_executor_class.call_args[0][0]
+        self.assertIsInstance(driver_instance, LazyDriverCommands)
+        command_executor_class.assert_called_once_with(driver_instance, command_logger)
         driver_listener_class.assert_called_once_with(command_executor_inst, xml_logger_inst, command_logger)
         server_inst.start_listening.assert_called_once_with(port=self._port)
+        self.assertIs(driver_listener_mod.ConnectionHandler, StreamingConnectionHandler)
+
+        self.assertIs(driver_instance.login, driver_commands_inst.login)
+        self.assertIs(driver_instance.get_state_id, driver_commands_inst.get_state_id)
+        importlib_mod.import_module.assert_called_once_with('{}.driver_commands'.format(driver_name), package=None)
+        driver_commands_mod.DriverCommands.assert_called_once_with(command_logger, runtime_config_instance)
+
+
+class TestStreamingConnectionHandler(TestCase):
+    def setUp(self):
+        self._socket = Mock()
+        self._xml_logger = Mock()
+        self._instance = StreamingConnectionHandler(self._socket, Mock(), self._xml_logger, Mock())
+
+    @staticmethod
+    def _response(response_info):
+        response = CommandResponse(Mock(command_name='GetStateId', command_id='1'))
+        response.timestamp = '18.10.2026 10:00:00'
+        response.success = True
+        response.response_info = response_info
+        return response
+
+    def test_streamed_response_matches_document(self):
+        streamed_info = Mock()
+        streamed_info.build_xml_node.return_value = Element('ResponseInfo', Value='1')
+        streamed_info.iter_xml.return_value = ['<ResponseInfo ', 'Value="1" />']
+        responses = [self._response(GetStateIdResponseInfo('5')), self._response(streamed_info)]
+        document = CommandResponsesBuilder.to_string(CommandResponsesBuilder.build_xml_result(responses))
+
+        self._instance._send_chunks(self._instance._iter_response(responses))
+
+        sent = ''.join(args[0] for args, _ in self._socket.sendall.call_args_list)
+        self.assertEqual(sent, document + '\r\n\r\n')
+        self.assertEqual(''.join(args[0] for args, _ in self._xml_logger.write.call_args_list), document)
+        self._xml_logger.end_response.assert_called_once_with()